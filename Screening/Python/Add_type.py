@@ -13,6 +13,11 @@ Optimalisert for fart og uten uønsket innrykk på 'type'-linjen.
 import os
 import glob
 import re
+import codecs
+import mmap
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import partial
 from datetime import datetime
 from pathlib import Path
 
@@ -50,68 +55,126 @@ MAPPING = {
 }
 # <<<<<<<<<<<<<<<<<<<<<<<<<<>>>>>>>>>>>>>>>>>>>>>>>>>>
 
-# Prekompilerte regex for fart
-RE_ENTRY_HEAD = re.compile(r'@\s*([A-Za-z][A-Za-z_-]*)\s*([{\(])', re.A)
+# Prekompilerte regex for fart (bytes + re.A: hele pipelinen jobber på UTF-8-bytes)
+RE_ENTRY_HEAD = re.compile(rb'@\s*([A-Za-z][A-Za-z_-]*)\s*([{\(])', re.A)
+RE_INDENT_FIELD = re.compile(rb'\n([ \t]*)[A-Za-z][A-Za-z0-9_-]*\s*=', re.A)
+# Tegn som kan være Unicode-whitespace uten at bytes.isspace() ser dem (\x1c-\x1f, ikke-ASCII);
+# da sjekkes 'type =' på dekodet tekst med RE_TYPE_FIELD
+RE_NON_ASCII_WS_HINT = re.compile(rb'[\x1c-\x1f\x80-\xff]')
 RE_TYPE_FIELD = re.compile(r'(?im)(^|[,\s])type\b\s*=')
-RE_INDENT_FIELD = re.compile(r'\n([ \t]*)[A-Za-z][A-Za-z0-9_-]*\s*=')
 
+# Spesial-entries som aldri skal ha 'type' (første bokstav brukes som billig forhåndssjekk)
+SKIP_TYPES = frozenset({"comment", "preamble", "string"})
 
-def read_text_with_fallback(path, encodings=("utf-8-sig", "utf-8", "cp1252", "latin-1")):
+
+ENCODINGS = ("utf-8-sig", "utf-8", "cp1252", "latin-1")
+UTF8_ENCODINGS = frozenset({"utf-8-sig", "utf-8"})
+DECODE_CHUNK = 1 << 20
+
+
+@contextmanager
+def mapped_file(path):
+    """Åpner filen som skrivebeskyttet mmap (bytes-buffer). Tom fil gir b""."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            yield buf
+
+
+def detect_encoding(buf, encodings=ENCODINGS):
+    """
+    Finner første encoding som dekoder hele bufferen uten feil.
+    Valideres bitvis med inkrementell dekoder, så hele filen aldri ligger som str.
+    Returnerer (encoding, errors).
+    """
     for enc in encodings:
+        decoder = codecs.getincrementaldecoder(enc)("strict")
         try:
-            with open(path, "r", encoding=enc, errors="strict") as f:
-                return f.read()
-        except Exception:
+            for pos in range(0, len(buf), DECODE_CHUNK):
+                decoder.decode(buf[pos:pos + DECODE_CHUNK])
+            decoder.decode(b"", final=True)
+            return enc, "strict"
+        except UnicodeDecodeError:
             pass
-    with open(path, "r", encoding="utf-8", errors="replace") as f:
-        return f.read()
+    return "utf-8", "replace"
 
 
-def extract_bibtex_entries(text):
+def to_utf8(buf, encoding=("utf-8", "strict")):
     """
-    Returnerer liste av (entry_type, raw_entry, start, end) ved å balansere { } / ( )
+    Gir bufferen som UTF-8-bytes med universelle linjeskift (\r\n/\r -> \n).
+    Gyldig UTF-8 brukes direkte (mmap-en selv når den verken har BOM eller \r);
+    andre encodinger dekodes og kodes om til UTF-8 én gang.
+    """
+    enc, errors = encoding
+    if enc in UTF8_ENCODINGS and errors == "strict":
+        data = buf[len(codecs.BOM_UTF8):] if buf[:len(codecs.BOM_UTF8)] == codecs.BOM_UTF8 else buf
+    else:
+        data = buf[:].decode(enc, errors).encode("utf-8")
+    if data.find(b"\r") != -1:
+        data = data[:].replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+    return data
+
+
+def extract_bibtex_entries(data):
+    """
+    Returnerer liste av (entry_type, raw_entry, start, end, open_off) ved å balansere { } / ( ).
+    data er UTF-8-bytes/mmap; raw_entry er en bytes-slice og start/end er byte-offset.
+    open_off er posisjonen til '{'/'(' i raw_entry, så hodet ikke må søkes opp igjen.
+    Klammene balanseres med bytes.find (C-skann) i stedet for tegn-for-tegn.
     """
     entries = []
-    i, n = 0, len(text)
+    i = 0
     while True:
-        m = RE_ENTRY_HEAD.search(text, i)
+        m = RE_ENTRY_HEAD.search(data, i)
         if not m:
             break
-        entry_type = m.group(1)
+        entry_type = m.group(1).decode("ascii")
         open_delim = m.group(2)
-        close_delim = '}' if open_delim == '{' else ')'
+        close_delim = b'}' if open_delim == b'{' else b')'
         # finn startpos for åpningstegn
         k = m.start(2)
-        # balanser
-        depth = 0
-        p = k
-        while p < n:
-            ch = text[p]
-            if ch == open_delim:
+        # balanser: tell åpninger foran hver lukking
+        depth = 1
+        p = k + 1
+        next_open = data.find(open_delim, p)
+        while depth:
+            close = data.find(close_delim, p)
+            if close == -1:
+                break
+            while next_open != -1 and next_open < close:
                 depth += 1
-            elif ch == close_delim:
-                depth -= 1
-                if depth == 0:
-                    p += 1
-                    break
-            p += 1
+                next_open = data.find(open_delim, next_open + 1)
+            depth -= 1
+            p = close + 1
         if depth != 0:
             # ubalansert, hopp én char videre
             i = m.end()
             continue
-        raw_entry = text[m.start():p]
-        entries.append((entry_type, raw_entry, m.start(), p))
+        entries.append((entry_type, data[m.start():p], m.start(), p, k - m.start()))
         i = p
     return entries
 
 
-def has_type_field(raw_entry):
+def has_type_field(raw_entry, open_off):
     # Søk etter 'type =' kun i felt-delen (etter første '{'/'(' )
-    head = RE_ENTRY_HEAD.search(raw_entry)
-    if not head:
-        return False
-    body = raw_entry[head.end():]
-    return RE_TYPE_FIELD.search(body) is not None
+    # 'type' må stå først eller etter ','/whitespace, fulgt av valgfri whitespace og '='
+    body = raw_entry[open_off+1:]
+    if RE_NON_ASCII_WS_HINT.search(body):
+        return RE_TYPE_FIELD.search(body.decode("utf-8")) is not None
+    body = body.lower()
+    n = len(body)
+    pos = body.find(b'type')
+    while pos != -1:
+        if pos == 0 or body[pos-1:pos] == b',' or body[pos-1:pos].isspace():
+            j = pos + 4
+            while j < n and body[j:j+1].isspace():
+                j += 1
+            if j < n and body[j:j+1] == b'=':
+                return True
+        pos = body.find(b'type', pos + 1)
+    return False
 
 
 def derive_type_value(entry_type):
@@ -119,70 +182,78 @@ def derive_type_value(entry_type):
     return MAPPING.get(t, t if t else "generic")
 
 
-def insert_type_field(raw_entry, type_value):
+def insert_type_field(raw_entry, type_value, open_off):
     """
     Sett inn 'type = {<verdi>}' etter første komma, på ny linje, uten ekstra innrykk
     (eller med samme innrykk som øvrige felt hvis vi finner det).
+    raw_entry er bytes; type_value kodes til UTF-8 her.
     """
-    head = RE_ENTRY_HEAD.search(raw_entry)
-    if not head:
-        return raw_entry
-
+    field = b"type = {" + type_value.encode("utf-8") + b"}"
     # finn første komma etter '{'/'('
-    open_pos = head.start(2)  # pos for '{' eller '('
-    comma_pos = raw_entry.find(',', open_pos + 1)
+    open_pos = open_off  # pos for '{' eller '('
+    comma_pos = raw_entry.find(b',', open_pos + 1)
     if comma_pos == -1:
         # ingen komma (uvanlig) -> sett rett før sluttklamme
-        close_delim = '}' if raw_entry[open_pos] == '{' else ')'
+        close_delim = b'}' if raw_entry[open_pos:open_pos+1] == b'{' else b')'
         close_pos = raw_entry.rfind(close_delim)
         if close_pos == -1:
             return raw_entry
-        return raw_entry[:close_pos] + ",\n" + f"type = {{{type_value}}}" + "\n" + raw_entry[close_pos:]
-
-    after = raw_entry[comma_pos+1:]
+        return raw_entry[:close_pos] + b",\n" + field + b"\n" + raw_entry[close_pos:]
 
     # Finn innrykk brukt av andre felt (hvis noen). Default: ingen innrykk.
-    indent = ""
-    m_ind = RE_INDENT_FIELD.search(after)
+    indent = b""
+    m_ind = RE_INDENT_FIELD.search(raw_entry, comma_pos + 1)
     if m_ind:
         indent = m_ind.group(1)  # eksakt samme innrykk som øvrige felt
 
-    insertion = "\n" + indent + f"type = {{{type_value}}},"
+    insertion = b"\n" + indent + field + b","
     return raw_entry[:comma_pos+1] + insertion + raw_entry[comma_pos+1:]
 
 
-def process_text_add_type(text):
-    entries = extract_bibtex_entries(text)
+def process_text_add_type(buf, encoding=("utf-8", "strict")):
+    """Legger til 'type' i buf (bytes/mmap) og returnerer (UTF-8-bytes, antall endringer)."""
+    data = to_utf8(buf, encoding)
+    entries = extract_bibtex_entries(data)
     if not entries:
-        return text, 0
+        return bytes(data[:]), 0
 
-    parts = []
+    out = bytearray()  # én voksende buffer i stedet for liste av småstrenger
     cursor = 0
     changes = 0
 
-    for entry_type, raw_entry, start, end in entries:
-        parts.append(text[cursor:start])
+    for entry_type, raw_entry, start, end, open_off in entries:
+        out += data[cursor:start]
 
         etype = (entry_type or "").lower()
-        if etype in {"comment", "preamble", "string"} or has_type_field(raw_entry):
-            parts.append(raw_entry)
+        if (etype[:1] in "cps" and etype in SKIP_TYPES) or has_type_field(raw_entry, open_off):
+            out += raw_entry
         else:
             type_value = derive_type_value(etype)
-            fixed = insert_type_field(raw_entry, type_value)
+            fixed = insert_type_field(raw_entry, type_value, open_off)
             if fixed != raw_entry:
                 changes += 1
-            parts.append(fixed)
+            out += fixed
 
         cursor = end
 
-    parts.append(text[cursor:])
-    return "".join(parts), changes
+    out += data[cursor:]
+    return bytes(out), changes
 
 
 def ensure_outdir(path: Path):
     path.mkdir(parents=True, exist_ok=True)
 
 
+def process_file(path: Path, dst: Path):
+    """Leser, legger til 'type' og skriver én fil. Returnerer (filnavn, antall endrede entries)."""
+    with mapped_file(path) as buf:
+        new_data, changes = process_text_add_type(buf, detect_encoding(buf))
+
+    out_path = dst / path.name
+    out_path.write_bytes(new_data)
+    return path.name, changes
+
+
 def main():
     src = SRC_DIR
     dst = DST_DIR
@@ -191,7 +262,7 @@ def main():
         raise FileNotFoundError(f"Finner ikke mappen: {src}")
     ensure_outdir(dst)
 
-    bib_files = sorted(src.glob("*.bib"))
+    bib_files = sorted(Path(e.path) for e in os.scandir(src) if e.name.endswith(".bib") and e.is_file())
     if not bib_files:
         print(f"Ingen .bib-filer funnet i: {src}")
         return
@@ -202,15 +273,16 @@ def main():
     print(f"Kilde: {src}")
     print(f"Mål  : {dst}\n")
 
-    for path in bib_files:
-        text = read_text_with_fallback(path)
-        new_text, changes = process_text_add_type(text)
-
-        out_path = dst / path.name
-        with open(out_path, "w", encoding="utf-8") as f:
-            f.write(new_text)
+    # Filene er uavhengige: kjør dem i parallelle prosesser når det er flere enn én
+    worker = partial(process_file, dst=dst)
+    if len(bib_files) > 1:
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+            results = list(ex.map(worker, bib_files, chunksize=4))
+    else:
+        results = map(worker, bib_files)
 
-        print(f"{path.name}: la til 'type' i {changes} entries")
+    for name, changes in results:
+        print(f"{name}: la til 'type' i {changes} entries")
         total_entries_changed += changes
 
     print("\nFerdig.")
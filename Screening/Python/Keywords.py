@@ -9,10 +9,17 @@
 - Lager OUTPUT_DIR/searchWords/NoMatch+<Antall>.bib for oppføringer uten noen treff
 """
 
-import os, re, sys
+import os, re, shutil, sys, tempfile
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
 
+try:
+    import ahocorasick  # valgfri: pip install pyahocorasick
+except ImportError:
+    ahocorasick = None
+
 # === KONFIG (relativ til prosjektrot) ===
 # Prosjektrot = mappa som inneholder "Python", "5.Add Type", "6.utvidet søk", osv.
 ROOT_DIR   = Path(__file__).resolve().parent.parent
@@ -20,7 +27,7 @@ INPUT_DIR  = ROOT_DIR / "5.Add Type"
 OUTPUT_DIR = ROOT_DIR / "6.Keywords"
 
 # Kun disse feltene brukes i søk (case-insensitiv sjekk på feltnavn)
-SEARCH_FIELDS = {"abstract", "title", "keywords", "note", "author_keywords"}
+SEARCH_FIELDS = frozenset({"abstract", "title", "keywords", "note", "author_keywords"})
 
 KEYWORDS = [
     "FEM-design",
@@ -131,22 +138,33 @@ ALIASES = {
 
 
 # === HJELPERE ===
+READ_BUFFER = 1 << 20  # stor lesebuffer: færre syscalls på store .bib
+
 def read_file(path):
-    with open(path, "r", encoding="utf-8") as f:
+    with open(path, "r", encoding="utf-8", buffering=READ_BUFFER) as f:
         return f.read()
 
 def write_file(path, text):
-    d = os.path.dirname(path)
-    if d:
-        os.makedirs(d, exist_ok=True)
-    with open(path, "w", encoding="utf-8", newline="\n") as f:
-        f.write(text)
+    # kod én gang og skriv i ett kall (ingen tekst-lag/codec per write)
+    p = Path(path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    p.write_bytes(text.encode("utf-8"))
 
 def iter_bib_files(root):
-    for dirpath, _dirnames, filenames in os.walk(root):
-        for fn in filenames:
-            if fn.lower().endswith(".bib"):
-                yield os.path.join(dirpath, fn)
+    """Rekursivt med os.scandir (samme rekkefølge som os.walk: filer først, så undermapper)."""
+    subdirs = []
+    try:
+        with os.scandir(root) as it:
+            for e in it:
+                if e.is_dir():
+                    if not e.is_symlink():
+                        subdirs.append(e.path)
+                elif e.name.lower().endswith(".bib"):
+                    yield e.path
+    except OSError:
+        return
+    for d in subdirs:
+        yield from iter_bib_files(d)
 
 def split_entries(bibtext):
     pieces = []; i = 0; n = len(bibtext)
@@ -175,106 +193,146 @@ def split_entries(bibtext):
             pieces.append(("entry", bibtext[at:])); i = n
     return pieces
 
+# Prekompilerte mønstre for entry-hodet (gjenbrukes for alle entries/filer)
+ENTRY_HDR_RE = re.compile(r'@([A-Za-z]+)\s*([({])', re.S)
+CITEKEY_RE = {'{': re.compile(r'[^,{}]*'), '(': re.compile(r'[^,()]*')}
+SAFE_KW_RE = re.compile(r'[^\w\s\-\+\.]')
+
 def parse_entry_header(entry_text):
-    m = re.match(r'@([A-Za-z]+)\s*([({])', entry_text, flags=re.S)
+    m = ENTRY_HDR_RE.match(entry_text)
     if not m: return None, None, entry_text, '{', '}'
     entry_type = m.group(1); open_char = m.group(2)
     close_char = '}' if open_char == '{' else ')'
-    start = m.end(0); depth = 1; i = start; n = len(entry_text)
-    citekey_chars = []
-    while i < n:
-        c = entry_text[i]
-        if c == open_char: depth += 1
-        elif c == close_char: depth -= 1; break
-        elif c == ',' and depth == 1: i += 1; break
-        else: citekey_chars.append(c)
-        i += 1
-    citekey = ''.join(citekey_chars).strip()
+    start = m.end(0); n = len(entry_text)
+    # citekey går til første ',' eller sluttklamme (ett regex-skann)
+    i = CITEKEY_RE[open_char].match(entry_text, start).end()
+    if i < n and entry_text[i] == open_char:
+        # sjelden: nestet klamme i citekey -> tegnvis som før
+        depth = 1; i = start
+        citekey_chars = []
+        while i < n:
+            c = entry_text[i]
+            if c == open_char: depth += 1
+            elif c == close_char: depth -= 1; break
+            elif c == ',' and depth == 1: i += 1; break
+            else: citekey_chars.append(c)
+            i += 1
+        citekey = ''.join(citekey_chars).strip()
+    else:
+        citekey = entry_text[start:i].strip()
+        if i < n and entry_text[i] == ',': i += 1
     body = entry_text[i:n]
     body_inner = body[:-1] if body.endswith(close_char) else body
     return entry_type, citekey, body_inner, open_char, close_char
 
+# Prekompilerte tokens for feltparseren (erstatter tegn-for-tegn-løkker)
+FIELD_NAME_RE = re.compile(r'[ \t\r\n,]*([A-Za-z0-9_:\-]*)\s*')
+BARE_VALUE_RE = re.compile(r'[^,#\r\n]*')
+WS_RE = re.compile(r'\s*')
+QUOTE_ESCAPE_RE = re.compile(r'\\(.?)', re.S)
+
 def parse_fields(body_text):
+    """Returnerer liste av (navn, navn i lowercase, verdi) for feltene i entry-body."""
     i = 0; n = len(body_text); fields = []
     while i < n:
-        while i < n and body_text[i] in " \t\r\n,":
-            i += 1
+        m = FIELD_NAME_RE.match(body_text, i)
+        i = m.end()
         if i >= n: break
-        name_start = i
-        while i < n and re.match(r'[A-Za-z0-9_:\-]', body_text[i]):
-            i += 1
-        name = body_text[name_start:i].strip()
-        while i < n and body_text[i].isspace():
-            i += 1
-        if i >= n or body_text[i] != '=':
-            while i < n and body_text[i] != ',': i += 1
-            if i < n: i += 1
+        if body_text[i] != '=':
+            # ikke et felt: hopp til neste komma
+            i = body_text.find(',', i)
+            i = n if i == -1 else i + 1
             continue
-        i += 1
-        while i < n and body_text[i].isspace():
-            i += 1
-        val, _raw_seg, i = read_value(body_text, i)
-        fields.append((name, val, _raw_seg))
+        i = WS_RE.match(body_text, i + 1).end()
+        val, i = read_value(body_text, i)
+        name = m.group(1)
+        fields.append((name, name.lower(), val))
     return fields
 
 def read_value(s, i):
-    n = len(s); start = i; parts = []; end_index = i
-    while i < n:
-        while i < n and s[i].isspace(): i += 1
+    n = len(s); parts = []
+    while True:
+        i = WS_RE.match(s, i).end()
         if i >= n: break
         if s[i] == '{':
-            val, j = read_braced(s, i); parts.append(val); i = j
+            val, i = read_braced(s, i)
         elif s[i] == '"':
-            val, j = read_quoted(s, i); parts.append(val); i = j
+            val, i = read_quoted(s, i)
         else:
-            j = i
-            while j < n and s[j] not in ',#\r\n': j += 1
-            parts.append(s[i:j].strip()); i = j
-        while i < n and s[i].isspace(): i += 1
+            m = BARE_VALUE_RE.match(s, i); val = m.group().strip(); i = m.end()
+        parts.append(val)
+        i = WS_RE.match(s, i).end()
         if i < n and s[i] == '#': i += 1; continue
-        if i < n and s[i] == ',': end_index = i + 1; break
-        else: end_index = i; break
-    return ''.join(parts).strip(), s[start:end_index], end_index
+        if i < n and s[i] == ',': i += 1
+        break
+    return ''.join(parts).strip(), i
 
 def read_braced(s, i):
-    n = len(s); assert s[i] == '{'
-    j = i + 1; depth = 1; out = []
-    while j < n:
-        c = s[j]
-        if c == '{': depth += 1; out.append(c)
-        elif c == '}':
-            depth -= 1
-            if depth == 0: return ''.join(out), j + 1
-            out.append(c)
-        else: out.append(c)
-        j += 1
-    return ''.join(out), n
+    """Balanserer { } ved å hoppe mellom str.find-treff; returnerer innholdet som ett slice."""
+    assert s[i] == '{'
+    depth = 1; j = i + 1
+    next_open = s.find('{', j)
+    while True:
+        close = s.find('}', j)
+        if close == -1:
+            return s[i+1:], len(s)
+        while next_open != -1 and next_open < close:
+            depth += 1
+            next_open = s.find('{', next_open + 1)
+        depth -= 1
+        j = close + 1
+        if depth == 0:
+            return s[i+1:close], j
 
 def read_quoted(s, i):
+    """Finner avsluttende '"' med str.find og returnerer innholdet som ett slice (\\x -> x)."""
     n = len(s); assert s[i] == '"'
-    j = i + 1; out = []; esc = False
-    while j < n:
-        c = s[j]
-        if esc: out.append(c); esc = False
-        else:
-            if c == '\\': esc = True
-            elif c == '"': return ''.join(out), j + 1
-            else: out.append(c)
-        j += 1
-    return ''.join(out), n
+    j = s.find('"', i + 1)
+    while j != -1:
+        # oddetall backslash rett foran => escapet anførselstegn, let videre
+        k = j
+        while k > i + 1 and s[k-1] == '\\':
+            k -= 1
+        if (j - k) % 2 == 0:
+            break
+        j = s.find('"', j + 1)
+    val = s[i+1:n if j == -1 else j]
+    if '\\' in val:
+        val = QUOTE_ESCAPE_RE.sub(r'\1', val)
+    return val, (n if j == -1 else j + 1)
 
 def rebuild_entry(entry_type, citekey, fields, open_char='{', close_char='}'):
-    lines = [f"@{entry_type}{open_char}{citekey},"]
-    for name, value, _raw in fields:
-        lines.append(f"  {name} = {{{value}}},")
-    lines.append(f"{close_char}")
-    return "\n".join(lines)
+    return (
+        f"@{entry_type}{open_char}{citekey},\n"
+        + "".join([f"  {name} = {{{value}}},\n" for name, _, value in fields])
+        + close_char
+    )
+
+WS_RUN_RE = re.compile(r'\s+')
+SPACE_RUN_RE = re.compile(rb' {2,}')
+
+# ASCII: A-Z -> a-z og alle whitespace-tegn (samme som \s i str) -> ' ', i én C-løkke
+_WS_BYTES = b' \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f'
+LOWER_WS_TABLE = bytes(
+    0x20 if c in _WS_BYTES else (c | 0x20 if 0x41 <= c <= 0x5A else c)
+    for c in range(256)
+)
 
 def normalize(s):
-    return ' '.join((s or "").lower().split())
+    s = s or ""
+    if s.isascii():
+        # hurtigvei: bytes.translate + én kollaps av mellomromsløp
+        b = SPACE_RUN_RE.sub(b' ', s.encode("ascii").translate(LOWER_WS_TABLE))
+        return b.strip(b' ').decode("ascii")
+    return WS_RUN_RE.sub(' ', s.lower()).strip()
+
+@lru_cache(maxsize=None)
+def _norm_alias(a):
+    """Normaliserer alias (liten, fast mengde) med cache."""
+    return normalize(a)
 
 def build_aliases(keywords, alias_map):
-    """Bygger alias-ordbok og rydder KEYWORDS for duplikater/whitespace."""
+    """Bygger alias-ordbok, rydder KEYWORDS for duplikater/whitespace og lager alias-matcher."""
     seen = set(); cleaned = []
     for k in keywords:
         k2 = k.strip()
@@ -299,24 +357,67 @@ def build_aliases(keywords, alias_map):
             a2 = a.strip()
             if a2 and a2 not in aliases[k]:
                 aliases[k].append(a2)
-    return aliases, cleaned  # cleaned = stabil rekkefølge ved utskrift
-
-def match_keywords(text, aliases):
-    """Case-insensitiv delstrengsøk på normalisert tekst."""
-    t = normalize(text); hits = []
-    for canonical, alias_list in aliases.items():
-        for a in alias_list:
-            if normalize(a) in t:
-                hits.append(canonical); break
-    # unike i rekkefølge
-    seen = set(); uniq = []
-    for h in hits:
-        key = h.lower()
-        if key not in seen:
-            seen.add(key); uniq.append(h)
-    return uniq  # tom liste ved null treff
-
-def process_bib_text(bibtext, aliases):
+
+    # Normaliser og dedupliser alias én gang. Et alias som inneholder et annet alias
+    # for samme hovedord kan aldri gi nye treff, så det droppes.
+    for k, alias_list in aliases.items():
+        norm = sorted({_norm_alias(a) for a in alias_list}, key=lambda a: (len(a), a))
+        aliases[k] = [a for a in norm if not any(b != a and b in a for b in norm)]
+
+    return build_matcher(aliases), cleaned  # cleaned = stabil rekkefølge ved utskrift
+
+def build_matcher(aliases):
+    """
+    Bygger alias-matcher én gang (alias er allerede normalisert i build_aliases):
+    - Aho–Corasick-automat over alle alias når pyahocorasick finnes (ett lineært pass per tekst);
+      hvert alias bærer en bitmaske over hovedord-indeksene, så treff samles som én int
+    - ellers én kompilert regex-alternasjon per hovedord
+    """
+    matcher = {"keys": list(aliases), "automaton": None, "patterns": None, "firsts": None}
+    # korteste alias: tekst kortere enn dette kan aldri gi treff
+    matcher["min_len"] = min((len(a) for alias_list in aliases.values() for a in alias_list), default=0)
+    if ahocorasick is not None:
+        words = defaultdict(int)  # normalisert alias -> bitmaske av hovedord (alias kan høre til flere)
+        for bit, alias_list in enumerate(aliases.values()):
+            for a in alias_list:
+                words[a] |= 1 << bit
+        automaton = ahocorasick.Automaton()
+        for w, mask in words.items():
+            automaton.add_word(w, mask)
+        automaton.make_automaton()
+        matcher["automaton"] = automaton
+        matcher["all_mask"] = (1 << len(aliases)) - 1
+    else:
+        matcher["patterns"] = {
+            k: re.compile("|".join(re.escape(a) for a in alias_list), re.IGNORECASE)
+            for k, alias_list in aliases.items()
+        }
+        # første tegn i hvert alias: hovedord uten noen av disse i teksten kan hoppes over
+        matcher["firsts"] = {k: frozenset(a[0] for a in alias_list) for k, alias_list in aliases.items()}
+    return matcher
+
+def match_keywords(text, matcher):
+    """Case-insensitiv delstrengsøk på normalisert tekst. Treff returneres i hovedord-rekkefølge."""
+    t = normalize(text)
+    if not t or len(t) < matcher["min_len"]:
+        return []
+    automaton = matcher["automaton"]
+    if automaton is not None:
+        found = 0; all_mask = matcher["all_mask"]
+        for _end, mask in automaton.iter(t):
+            found |= mask
+            if found == all_mask:
+                break  # alle hovedord truffet
+        if not found:
+            return []
+        return [k for bit, k in enumerate(matcher["keys"]) if found >> bit & 1]
+    present = set(t); firsts = matcher["firsts"]
+    return [
+        k for k, pat in matcher["patterns"].items()
+        if not firsts[k].isdisjoint(present) and pat.search(t)
+    ]  # tom liste ved null treff
+
+def process_bib_text(bibtext, matcher):
     pieces = split_entries(bibtext)
     rebuilt_pieces = []
     per_kw = defaultdict(list)
@@ -335,8 +436,7 @@ def process_bib_text(bibtext, aliases):
         # Bygg søketekst KUN fra ønskede felt (ignorér evt. eksisterende searchWord)
         search_values = []
         idx_sw = None
-        for i, (name, val, _raw) in enumerate(fields):
-            lname = name.lower()
+        for i, (_, lname, val) in enumerate(fields):
             if lname == "searchword":
                 idx_sw = i
                 continue
@@ -345,14 +445,14 @@ def process_bib_text(bibtext, aliases):
 
         base_text = " ".join(v for v in search_values if v)
 
-        hits = match_keywords(base_text, aliases)
+        hits = match_keywords(base_text, matcher)
         search_val = "; ".join(hits) if hits else "NoMatch"
 
         # sett/oppdater searchWord
         if idx_sw is None:
-            fields.append(("searchWord", search_val, None))
+            fields.append(("searchWord", "searchword", search_val))
         else:
-            fields[idx_sw] = ("searchWord", search_val, None)
+            fields[idx_sw] = ("searchWord", "searchword", search_val)
 
         rebuilt = rebuild_entry(etype, key, fields, o, c)
         rebuilt_pieces.append(rebuilt)
@@ -365,6 +465,65 @@ def process_bib_text(bibtext, aliases):
 
     return "".join(rebuilt_pieces), per_kw, nomatch_entries
 
+SHARD_COPY_BUFFER = 1 << 20
+
+def shard_path(shard_dir, file_idx, tag):
+    """Shard for én fil og én kategori (tag = keyword-nr eller "nomatch")."""
+    return os.path.join(shard_dir, f"{file_idx}-{tag}.bib")
+
+def write_shard(path, entries):
+    Path(path).write_bytes("\n\n".join(entries).encode("utf-8"))
+
+def merge_shards(path, shards):
+    """
+    Slår sammen shards (i filrekkefølge) til én fil med blokk-kopi (shutil.copyfileobj).
+    Resultatet er det samme som "\n\n".join(alle entries) + "\n" (tom fil uten entries).
+    """
+    with open(path, "wb") as out:
+        for n, shard in enumerate(shards):
+            if n:
+                out.write(b"\n\n")
+            with open(shard, "rb") as f:
+                shutil.copyfileobj(f, out, SHARD_COPY_BUFFER)
+        if shards:
+            out.write(b"\n")
+
+def process_bib_file(job, input_dir, output_dir, matcher, shard_keys, shard_dir):
+    """
+    Prosesserer én .bib-fil (kjøres også i egne prosesser fra main).
+    job = (filnr, sti). Treff skrives som shards i shard_dir i stedet for å sendes
+    tilbake til hovedprosessen; kun antallene returneres:
+    (meldinger, {keyword-nr: antall}, antall NoMatch).
+    """
+    file_idx, bibpath = job
+    try:
+        bibtext = read_file(bibpath)
+    except Exception as e:
+        return [f"[ADVARSEL] Lese-feil {bibpath}: {e}"], {}, 0
+
+    modified, per_kw, nomatch_entries = process_bib_text(bibtext, matcher)
+
+    # Skriv modifisert fil under OUTPUT_DIR, speil relativ sti fra INPUT_DIR
+    rel = os.path.relpath(bibpath, input_dir)
+    base, ext = os.path.splitext(rel)
+    out_bib = os.path.join(output_dir, f"{base}_with_searchword{ext}")
+
+    try:
+        write_file(out_bib, modified)
+        msg = f"[OK] Skrev: {out_bib}"
+    except Exception as e:
+        msg = f"[FEIL] Skrive-feil {out_bib}: {e}"
+
+    kw_counts = {}
+    for kw_idx, kw in enumerate(shard_keys):
+        entries = per_kw.get(kw)
+        if entries:
+            write_shard(shard_path(shard_dir, file_idx, kw_idx), entries)
+            kw_counts[kw_idx] = len(entries)
+    if nomatch_entries:
+        write_shard(shard_path(shard_dir, file_idx, "nomatch"), nomatch_entries)
+    return [msg], kw_counts, len(nomatch_entries)
+
 # === MAIN ===
 def main():
     input_dir_str = str(INPUT_DIR)
@@ -374,56 +533,51 @@ def main():
         print(f"[FEIL] Fant ikke INPUT_DIR: {input_dir_str}")
         sys.exit(1)
 
-    aliases, ordered_keywords = build_aliases(KEYWORDS, ALIASES)
+    matcher, ordered_keywords = build_aliases(KEYWORDS, ALIASES)
 
     outdir_kw = os.path.join(output_dir_str, "searchWords")
     os.makedirs(outdir_kw, exist_ok=True)
 
-    aggregated_per_kw = defaultdict(list)
-    aggregated_nomatch = []
-    file_count = 0
-
-    for bibpath in iter_bib_files(input_dir_str):
-        file_count += 1
-        try:
-            bibtext = read_file(bibpath)
-        except Exception as e:
-            print(f"[ADVARSEL] Lese-feil {bibpath}: {e}")
-            continue
-
-        modified, per_kw, nomatch_entries = process_bib_text(bibtext, aliases)
-
-        # Skriv modifisert fil under OUTPUT_DIR, speil relativ sti fra INPUT_DIR
-        rel = os.path.relpath(bibpath, input_dir_str)
-        base, ext = os.path.splitext(rel)
-        out_bib = os.path.join(output_dir_str, f"{base}_with_searchword{ext}")
-
-        try:
-            write_file(out_bib, modified)
-            print(f"[OK] Skrev: {out_bib}")
-        except Exception as e:
-            print(f"[FEIL] Skrive-feil {out_bib}: {e}")
-
-        for k, entries in per_kw.items():
-            aggregated_per_kw[k].extend(entries)
-        aggregated_nomatch.extend(nomatch_entries)
+    bib_files = list(iter_bib_files(input_dir_str))
+    file_count = len(bib_files)
 
     if file_count == 0:
         print("[ADVARSEL] Ingen .bib-filer funnet i INPUT_DIR.")
         sys.exit(0)
 
-    # Skriv per-keyword filer i stabil rekkefølge
-    for kw in ordered_keywords:
-        entries = aggregated_per_kw.get(kw, [])
-        safe_kw = re.sub(r'[^\w\s\-\+\.]', '_', kw).strip().replace(" ", "_")
-        path = os.path.join(outdir_kw, f"{safe_kw}+{len(entries)}.bib")
-        write_file(path, "\n\n".join(entries) + ("\n" if entries else ""))
-        print(f"[OK] Kategori '{kw}': {len(entries)} -> {path}")
-
-    # Skriv NoMatch KUN for oppføringer uten noen treff
-    path_nomatch = os.path.join(outdir_kw, f"NoMatch+{len(aggregated_nomatch)}.bib")
-    write_file(path_nomatch, "\n\n".join(aggregated_nomatch) + ("\n" if aggregated_nomatch else ""))
-    print(f"[OK] Kategori 'NoMatch': {len(aggregated_nomatch)} -> {path_nomatch}")
+    # Shards legges i en midlertidig mappe under OUTPUT_DIR og slettes til slutt
+    with tempfile.TemporaryDirectory(prefix=".shards-", dir=output_dir_str) as shard_dir:
+        # Filene er uavhengige: kjør dem i parallelle prosesser når det er flere enn én
+        worker = partial(process_bib_file, input_dir=input_dir_str, output_dir=output_dir_str,
+                         matcher=matcher, shard_keys=ordered_keywords, shard_dir=shard_dir)
+        jobs = list(enumerate(bib_files))
+        if file_count > 1:
+            with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+                results = list(ex.map(worker, jobs, chunksize=4))
+        else:
+            results = list(map(worker, jobs))
+
+        for messages, _, _ in results:
+            for msg in messages:
+                print(msg)
+
+        # Skriv per-keyword filer i stabil rekkefølge (shards i filrekkefølge)
+        for kw_idx, kw in enumerate(ordered_keywords):
+            shards = [shard_path(shard_dir, file_idx, kw_idx)
+                      for file_idx, (_, kw_counts, _) in enumerate(results) if kw_idx in kw_counts]
+            count = sum(kw_counts.get(kw_idx, 0) for _, kw_counts, _ in results)
+            safe_kw = SAFE_KW_RE.sub('_', kw).strip().replace(" ", "_")
+            path = os.path.join(outdir_kw, f"{safe_kw}+{count}.bib")
+            merge_shards(path, shards)
+            print(f"[OK] Kategori '{kw}': {count} -> {path}")
+
+        # Skriv NoMatch KUN for oppføringer uten noen treff
+        shards = [shard_path(shard_dir, file_idx, "nomatch")
+                  for file_idx, (_, _, n_nomatch) in enumerate(results) if n_nomatch]
+        count = sum(n_nomatch for _, _, n_nomatch in results)
+        path_nomatch = os.path.join(outdir_kw, f"NoMatch+{count}.bib")
+        merge_shards(path_nomatch, shards)
+        print(f"[OK] Kategori 'NoMatch': {count} -> {path_nomatch}")
 
     print(f"[FERDIG] Prosesserte {file_count} .bib-fil(er). Resultater i: {output_dir_str}")
 
@@ -40,59 +40,193 @@ def active_filters():
 
 
 # === HJELPEFUNKSJONER ===
-import os, re, sys
-from typing import Callable, Dict, Iterable, List, Optional
-
-_entry_start_re = re.compile(r'^\s*@([A-Za-z]+)\s*\{\s*([^,]*)\s*,?', re.UNICODE | re.MULTILINE)
-
-def normalize_value(v: str) -> str:
-    """Fjerner {…} eller "…" rundt enkeltverdi og trimmer. Tar første linje."""
-    v = v.strip()
-    first_line = v.splitlines()[0].strip()
-    if (first_line.startswith('{') and first_line.endswith('}')) or \
-       (first_line.startswith('"') and first_line.endswith('"')):
-        first_line = first_line[1:-1].strip()
-    return first_line
+import os, re, shutil, sys, tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Optional
+
+from bibtex import brace_end
+
+# Prekompilerte mønstre (brukes per entry/linje; slipper re-cache-oppslag per kall)
+_has_type_re = re.compile(r'(?im)^[ \t]*type[ \t]*=')
+_close_brace_line_re = re.compile(r'^[ \t]*}\s*$')
+_indent_re = re.compile(r'^([ \t]*)')
+# Andre linjeskift enn \n / \r\n som splitlines() også deler på
+_odd_break_re = re.compile('[\r\x0b\x0c\x1c-\x1e\x85\u2028\u2029]')
+
+_NAME_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_:-")
+_SKIP_CHARS = frozenset(" \t\r\n\f\v,")
+_BARE_STOP = frozenset(",\r\n}")
+
+_ASCII_LETTERS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz")
+
+def _scan_braced(text: str, i: int):
+    """text[i] == '{': returnerer (indre verdi, pos etter matchende '}'), eller None hvis ubalansert."""
+    j = brace_end(text, i)
+    if j == -1:
+        return None
+    return text[i+1:j-1], j
+
+def _scan_bare(text: str, i: int, n: int) -> int:
+    """Slutten på en verdi uten avgrensning: til ',', linjeskift eller '}'."""
+    while i < n and text[i] not in _BARE_STOP:
+        i += 1
+    return i
 
 def extract_all_fields(entry_text: str) -> Dict[str, str]:
     """
-    Grov parser: henter første forekomst av hvert felt (case-insensitivt navn).
-    Legger også til 'searchword_list' = splittet på ';'
+    Enkel skanner i ett pass: henter første forekomst av hvert felt (case-insensitivt navn).
+    {…} balanseres, "…" går til neste '"', ellers leses verdien til ','/linjeskift/'}'.
+    Verdien returneres uten ytre {…}/"…" og trimmet.
+    Legger også til 'searchword_list' = splittet på ';', og '_has_type' = True når et
+    type-felt står først på en linje (da vil has_type_field også finne det).
     """
     fields: Dict[str, str] = {}
-    for m in re.finditer(r'(?im)^[ \t]*([A-Za-z0-9_:\-]+)[ \t]*=[ \t]*(".*?"|\{.*?\}|[^,\r\n]+)', entry_text, flags=re.DOTALL):
-        name = m.group(1).strip().lower()
-        if name in fields:
+    has_type = False
+    n = len(entry_text)
+    # hopp over hodet: '@type{' + citekey + ','
+    i = entry_text.find('{')
+    i = entry_text.find(',', i + 1) if i != -1 else -1
+    if i == -1:
+        i = n
+    while i < n:
+        c = entry_text[i]
+        if c in _SKIP_CHARS:
+            i += 1; continue
+        if c == '%':
+            # kommentar: resten av linjen
+            i = entry_text.find('\n', i)
+            if i == -1: break
             continue
-        fields[name] = normalize_value(m.group(2))
+        start = i
+        while i < n and entry_text[i] in _NAME_CHARS:
+            i += 1
+        name = entry_text[start:i]
+        while i < n and entry_text[i] in ' \t':
+            i += 1
+        if not name or i >= n or entry_text[i] != '=':
+            # ikke et felt: hopp til neste komma
+            i = entry_text.find(',', i)
+            if i == -1: break
+            continue
+        i += 1
+        while i < n and entry_text[i] in ' \t':
+            i += 1
+        c = entry_text[i] if i < n else ''
+        value = None
+        if c == '{':
+            scanned = _scan_braced(entry_text, i)
+            if scanned is not None:
+                value, i = scanned
+        elif c == '"':
+            close = entry_text.find('"', i + 1)
+            if close != -1:
+                value = entry_text[i+1:close]; i = close + 1
+        if value is None:
+            end = _scan_bare(entry_text, i, n)
+            value = entry_text[i:end]; i = end
+        name = name.lower()
+        if name == 'type' and not has_type:
+            k = start
+            while k > 0 and entry_text[k-1] in ' \t':
+                k -= 1
+            has_type = k == 0 or entry_text[k-1] == '\n'
+        if name not in fields:
+            fields[name] = value.strip()
     if 'language' not in fields and 'langid' in fields:
         fields['language'] = fields['langid']
     sw = fields.get('searchword')
     fields['searchword_list'] = [p.strip() for p in sw.split(';') if p.strip()] if sw is not None else []
+    fields['searchword_set'] = frozenset(fields['searchword_list'])  # O(1) medlemskap i filtrene
+    fields['_has_type'] = has_type
+    # lowercase-cache for case-insensitive filtre (fylles ved behov av _lower_field)
+    fields['__lc__'] = {}
     return fields
 
-def iter_entries_with_raw(text: str):
-    """Yielder (raw_block, entry_type, entry_key) for hver @entry."""
-    i = 0; n = len(text)
-    while i < n:
-        m = _entry_start_re.search(text, i)
-        if not m: break
-        start = m.start(); etype = m.group(1)
-        brace_pos = text.find('{', m.end(1))
-        if brace_pos == -1: i = m.end(); continue
-        depth = 0; j = brace_pos
-        while j < n:
-            c = text[j]
-            if c == '{': depth += 1
-            elif c == '}':
-                depth -= 1
-                if depth == 0:
-                    end = j + 1
-                    yield text[start:end], etype, m.group(2)
-                    i = end; break
-            j += 1
+# Samme raw-entry (f.eks. duplikater i filen) parses bare én gang. Dict-en deles mellom
+# treffene; den endres kun via lowercase-cachen, som gir samme verdier for lik raw.
+_extract_cached = lru_cache(maxsize=1024)(extract_all_fields)
+
+READ_CHUNK = 1 << 20  # tegn per read() ved strømming av input
+
+def _scan_entries(text: str, i: int, pos: int, final: bool):
+    """
+    Kjernen i entry-skanneren, i ett lineært pass:
+    '@' finnes med str.find, hodet '@type{' sjekkes tegnvis og klammene balanseres med brace_end.
+    Et '@' teller bare når det står først på linjen (evt. etter blanktegn); raw_block starter
+    da ved første linjestart i blanktegnene foran.
+
+    i = slutten på forrige entry, pos = hvor neste '@' letes fra. Yielder (raw_block, entry_type,
+    entry_key), der raw_block alltid slutter med '\n', og returnerer (i, pos, ferdig). Med final=False stopper den der teksten slutter
+    midt i en entry, så kallet kan gjentas fra (i, pos) når mer tekst er lest inn.
+    """
+    n = len(text)
+    at = text.find('@', pos)
+    while at != -1:
+        # blanktegn rett foran '@' (ikke lenger tilbake enn i)
+        ws = at
+        while ws > i and text[ws-1].isspace():
+            ws -= 1
+        if ws == 0 or text[ws-1] == '\n':
+            start = ws
         else:
-            i = n; break
+            start = text.find('\n', ws, at) + 1
+            if start == 0:
+                # tekst foran '@' på samme linje: ikke en entry
+                at = text.find('@', at + 1); continue
+        # entry-type: [A-Za-z]+, evt. blanktegn, så '{'
+        j = at + 1
+        while j < n and text[j] in _ASCII_LETTERS:
+            j += 1
+        etype = text[at+1:j]
+        while j < n and text[j].isspace():
+            j += 1
+        if j >= n and not final:
+            return i, at, False
+        if not etype or j >= n or text[j] != '{':
+            at = text.find('@', at + 1); continue
+        brace_pos = j
+        end = brace_end(text, brace_pos)
+        if end == -1:
+            # ubalansert: resten av filen kan ikke leses som entries (eller: les mer)
+            return i, at, final
+        # citekey: fra første ikke-blanke tegn etter '{' til første ','
+        k = brace_pos + 1
+        while k < n and text[k].isspace():
+            k += 1
+        comma = text.find(',', k)
+        if comma == -1 and not final:
+            return i, at, False
+        key = text[k:comma] if comma != -1 else text[k:]
+        # raw slutter på '}': ta med linjeskiftet etter i samme slice når det finnes
+        yield (text[start:end+1] if text[end:end+1] == '\n' else text[start:end] + '\n'), etype, key
+        i = end
+        at = text.find('@', i)
+    return i, n, final
+
+def iter_entries_with_raw(text: str):
+    """Yielder (raw_block, entry_type, entry_key) for hver @entry i text (raw_block slutter med '\n')."""
+    yield from _scan_entries(text, 0, 0, True)
+
+def iter_entries_from_stream(fp, chunk_size: int = READ_CHUNK):
+    """
+    Som iter_entries_with_raw, men leser fp bit for bit (rullende buffer).
+    Tekst før forrige entry-slutt kastes (ett tegn beholdes for linjestart-sjekken),
+    så minnebruken følger største entry i stedet for hele filen.
+    """
+    buf = ""; i = 0; pos = 0
+    while True:
+        chunk = fp.read(chunk_size)
+        final = not chunk
+        drop = i - 1
+        if drop > 0:
+            buf = buf[drop:]; i -= drop; pos -= drop
+        buf += chunk
+        i, pos, done = yield from _scan_entries(buf, i, pos, final)
+        if done:
+            return
 
 def ensure_dir(path):
     os.makedirs(path, exist_ok=True)
@@ -102,17 +236,27 @@ def choose_input_file(folder):
     folder = str(folder)
     if not os.path.isdir(folder):
         raise FileNotFoundError(f"Fant ikke mappe: {folder}")
-    bibs = [os.path.join(folder, f) for f in os.listdir(folder) if f.lower().endswith('.bib')]
+    # Én katalog-gjennomgang; DirEntry.stat() er hurtigbufret, så ingen ekstra getmtime-kall
+    with os.scandir(folder) as it:
+        bibs = [(e.path, e.stat().st_mtime) for e in it
+                if e.is_file() and e.name.lower().endswith('.bib')]
     if not bibs:
         raise FileNotFoundError(f"Ingen .bib-filer i: {folder}")
-    if len(bibs) == 1:
-        return bibs[0]
-    prefer = [p for p in bibs if p.lower().endswith('_with_searchword.bib')]
-    if prefer:
-        prefer.sort(key=lambda p: os.path.getmtime(p), reverse=True)
-        return prefer[0]
-    bibs.sort(key=lambda p: os.path.getmtime(p), reverse=True)
-    return bibs[0]
+    prefer = [b for b in bibs if b[0].lower().endswith('_with_searchword.bib')]
+    # max() gir første av like mtime, som den stabile sorteringen tidligere
+    return max(prefer or bibs, key=lambda b: b[1])[0]
+
+_SAFE_NAME_EXTRA = frozenset("_-+.")
+
+def safe_name(s: str) -> str:
+    """Filnavn-trygg bucket-label: alt utenom bokstaver/tall/_-+. blir ett '_' per løp."""
+    out = []; in_run = False
+    for c in s:
+        if c.isalnum() or c in _SAFE_NAME_EXTRA:
+            out.append(c); in_run = False
+        elif not in_run:
+            out.append('_'); in_run = True
+    return ''.join(out).strip('_')
 
 def make_output_path(input_file: str, out_dir) -> str:
     base = os.path.splitext(os.path.basename(input_file))[0]
@@ -120,7 +264,7 @@ def make_output_path(input_file: str, out_dir) -> str:
 
 # --- Bevar "type = {entrytype}" ved behov (gjøres ETTER filtrering) ---
 def has_type_field(raw_entry: str) -> bool:
-    return re.search(r'(?im)^[ \t]*type[ \t]*=', raw_entry) is not None
+    return _has_type_re.search(raw_entry) is not None
 
 def _detect_newline_style(lines):
     for ln in reversed(lines):
@@ -145,21 +289,21 @@ def _ensure_trailing_comma_on_line(line: str) -> str:
     main_r = main.rstrip()
     return (main + comment + nl) if main_r.endswith(',') else (main_r + ',' + (comment or '') + nl)
 
-def ensure_type_field_as_class(raw_entry: str, entry_type: str) -> str:
-    if has_type_field(raw_entry): return raw_entry
+def _ensure_type_field_by_lines(raw_entry: str, entry_type: str) -> str:
+    # Linjebasert variant; brukes bare for uvanlige linjeskift (\r, \f, \u2028 osv.)
     class_value = entry_type.lower()
     trimmed = raw_entry.rstrip()
     if not trimmed.endswith('}'): return raw_entry
     lines = trimmed.splitlines(keepends=True)
     close_idx = None
     for idx in range(len(lines)-1, -1, -1):
-        if re.match(r'^[ \t]*}\s*$', lines[idx]): close_idx = idx; break
+        if _close_brace_line_re.match(lines[idx]): close_idx = idx; break
     if close_idx is None: return raw_entry
     newline = _detect_newline_style(lines)
     last_sig_idx = _last_significant_before_closing(lines, close_idx)
     indent = "  "
     if last_sig_idx is not None:
-        m = re.match(r'^([ \t]*)', lines[last_sig_idx])
+        m = _indent_re.match(lines[last_sig_idx])
         if m: indent = m.group(1) or indent
         lines[last_sig_idx] = _ensure_trailing_comma_on_line(lines[last_sig_idx])
     new_type_line = f"{indent}type = {{{class_value}}}{newline}"
@@ -169,40 +313,175 @@ def ensure_type_field_as_class(raw_entry: str, entry_type: str) -> str:
         result += '\n'
     return result
 
+def _line_body(text: str, s: int, e: int) -> str:
+    # Linjen text[s:e] uten avsluttende \r (del av \r\n)
+    if e > s and text[e - 1] == '\r': e -= 1
+    return text[s:e]
+
+def ensure_type_field_as_class(raw_entry: str, entry_type: str) -> str:
+    if _has_type_re.search(raw_entry): return raw_entry
+    trimmed = raw_entry.rstrip()
+    if not trimmed.endswith('}'): return raw_entry
+    close = len(trimmed) - 1
+    # Start på linjen med avsluttende '}' – må bestå av bare mellomrom/tab + '}'
+    ls = trimmed.rfind('\n', 0, close) + 1
+    if ls == 0 or trimmed[ls:close].strip(' \t'):
+        return _ensure_type_field_by_lines(raw_entry, entry_type)
+    newline = '\r\n' if trimmed[ls - 2:ls] == '\r\n' else '\n'
+    # Gå bakover til siste signifikante linje (ikke tom, ikke %-kommentar)
+    sig_s = sig_e = -1
+    e = ls - 1
+    while e >= 0:
+        s = trimmed.rfind('\n', 0, e) + 1
+        body = _line_body(trimmed, s, e)
+        if _odd_break_re.search(body):
+            return _ensure_type_field_by_lines(raw_entry, entry_type)
+        b = body.strip()
+        if b and not b.startswith('%'):
+            sig_s, sig_e = s, e + 1
+            break
+        e = s - 1
+    indent = "  "
+    if sig_s >= 0:
+        k = sig_s
+        while trimmed[k] in ' \t': k += 1
+        indent = trimmed[sig_s:k] or indent
+        head = trimmed[:sig_s] + _ensure_trailing_comma_on_line(trimmed[sig_s:sig_e]) + trimmed[sig_e:ls]
+    else:
+        head = trimmed[:ls]
+    result = f"{head}{indent}type = {{{entry_type.lower()}}}{newline}{trimmed[ls:]}"
+    if raw_entry.endswith('\n'):
+        result += '\n'
+    return result
+
 
 # === FILTER-KOMBINATORER + MERKING (for rapportering) ===
-def _mark(f, bucket: str, label: str):
+# Estimert kostnad per filter: main kjører filtrene billigst først (stabil sortering,
+# så filtre med lik kostnad beholder rekkefølgen fra active_filters()).
+COST_IGNORED = 0   # passerer alltid
+COST_FIELD   = 1   # ett dict-oppslag (år/type/språk)
+COST_COMPARE = 2   # oppslag + sammenlikning/lengde
+COST_SCAN    = 3   # søk i searchword-listen
+COST_REGEX   = 5
+COST_UNKNOWN = 100 # egendefinerte/umerkede filtre
+
+def _mark(f, bucket: str, label: str, cost: int = COST_UNKNOWN):
     try: f.__name__ = label
     except Exception: pass
     setattr(f, "label", label)
     setattr(f, "bucket", bucket)
+    setattr(f, "cost", cost)
     return f
 
+def filter_cost(f) -> int:
+    return getattr(f, "cost", COST_UNKNOWN)
+
+def _flatten(fl, bucket: str):
+    """Legger inn medlemmene til nestede kombinatorer av samme slag: all_of(all_of(x), y) -> (x, y)."""
+    flat = []
+    for fn in fl:
+        members = getattr(fn, "members", None)
+        if members is not None and getattr(fn, "bucket", None) == bucket:
+            flat.extend(members)
+        else:
+            flat.append(fn)
+    return tuple(flat)
+
 def all_of(filters: Iterable[Callable[[str, Dict[str, str], str], bool]]):
     fl = [f for f in filters if f]
-    if not fl: return _mark(lambda e,fd,r: True, "logic:all", "all_of[empty]")
-    def _f(e,fd,r): return all(fn(e,fd,r) for fn in fl)
+    if not fl: return _mark(lambda e,fd,r: True, "logic:all", "all_of[empty]", cost=COST_IGNORED)
+    members = _flatten(fl, "logic:all")
+    def _f(e, fd, r, _fl=members):
+        for fn in _fl:
+            if not fn(e, fd, r): return False
+        return True
     label = "all_of[" + ",".join(getattr(fn,"label",getattr(fn,"__name__","filter")) for fn in fl) + "]"
-    return _mark(_f, "logic:all", label)
+    f = _mark(_f, "logic:all", label, sum(filter_cost(fn) for fn in members))
+    setattr(f, "members", members)
+    return f
+
+def _fused_field_match(f: str, equals, needles):
+    """Ett predikat for flere ci-like/inneholder-filtre på samme felt: ett set-oppslag + ett regex-søk."""
+    eq = frozenset(equals)
+    rx = re.compile("|".join(re.escape(n) for n in needles)) if needles else None
+    if rx is None:
+        def _f(etype, fields, raw): return _lower_field(fields, f) in eq
+    else:
+        def _f(etype, fields, raw):
+            v = _lower_field(fields, f)
+            return v in eq or rx.search(v) is not None
+    return _f
+
+def _fuse_any(members):
+    """
+    Slår sammen nabo-medlemmer i any_of som er by_field_equals/by_field_contains (ci) på samme felt.
+    Bare nabo-løp, så rekkefølgen mot andre filtre (og evt. unntak fra dem) er som før.
+    """
+    out = []; i = 0; n = len(members)
+    while i < n:
+        m = getattr(members[i], "ci_match", None)
+        j = i + 1
+        if m is not None:
+            while j < n and getattr(members[j], "ci_match", (None,))[0] == m[0]:
+                j += 1
+        if j - i < 2:
+            out.append(members[i]); i += 1; continue
+        run = [fn.ci_match for fn in members[i:j]]
+        out.append(_fused_field_match(m[0], [v for _, op, v in run if op == "=="],
+                                      [v for _, op, v in run if op == "~="]))
+        i = j
+    return tuple(out)
 
 def any_of(filters: Iterable[Callable[[str, Dict[str, str], str], bool]]):
     fl = [f for f in filters if f]
-    if not fl: return _mark(lambda e,fd,r: True, "logic:any", "any_of[empty]")
-    def _f(e,fd,r): return any(fn(e,fd,r) for fn in fl)
+    if not fl: return _mark(lambda e,fd,r: True, "logic:any", "any_of[empty]", cost=COST_IGNORED)
+    members = _flatten(fl, "logic:any")
+    def _f(e, fd, r, _fl=_fuse_any(members)):
+        for fn in _fl:
+            if fn(e, fd, r): return True
+        return False
     label = "any_of[" + ",".join(getattr(fn,"label",getattr(fn,"__name__","filter")) for fn in fl) + "]"
-    return _mark(_f, "logic:any", label)
+    f = _mark(_f, "logic:any", label, sum(filter_cost(fn) for fn in members))
+    setattr(f, "members", members)
+    return f
 
 
 # === FILTER-BYGGESTEINER (alle ignorerer når “tomme”) ===
+def _lower_field(fields: Dict[str, str], f: str) -> str:
+    """
+    fields.get(f, "").lower(), cachet per entry i fields['__lc__'] (delt av alle filtre).
+    Cachen lages i extract_all_fields; felt lowercases først når et filter ber om dem.
+    """
+    lc = fields.get('__lc__')
+    if lc is None:  # fields laget utenom extract_all_fields
+        lc = fields['__lc__'] = {}
+    v = lc.get(f)
+    if v is None:
+        v = lc[f] = fields.get(f, "").lower()
+    return v
+
+def _first_year(y: str) -> Optional[int]:
+    """Første løp av fire sifre i y som int (som re.search(r'\d{4}')), uten regex-motoren."""
+    if len(y) >= 4 and y[:4].isdecimal():  # vanligste tilfelle: year = {2020}
+        return int(y[:4])
+    run = 0
+    for i, ch in enumerate(y):
+        if ch.isdecimal():
+            run += 1
+            if run == 4:
+                return int(y[i-3:i+1])
+        else:
+            run = 0
+    return None
+
 def by_year_range(min_year: int, max_year: int):
     def _f(etype, fields, raw):
         y = fields.get('year')
         if not y: return False
-        m = re.search(r'\d{4}', y)
-        if not m: return False
-        yi = int(m.group(0))
+        yi = _first_year(y)
+        if yi is None: return False
         return (min_year <= yi <= max_year)
-    return _mark(_f, "year", f"by_year_range[{min_year}-{max_year}]")
+    return _mark(_f, "year", f"by_year_range[{min_year}-{max_year}]", COST_FIELD)
 
 def by_types(allowed: Iterable[str]):
     """
@@ -211,10 +490,10 @@ def by_types(allowed: Iterable[str]):
     """
     allowed = {t.strip().lower() for t in (allowed or []) if str(t).strip()}
     if not allowed:
-        return _mark(lambda e,fd,r: True, "type", "by_types[ignored]")
+        return _mark(lambda e,fd,r: True, "type", "by_types[ignored]", cost=COST_IGNORED)
     def _f(etype, fields, raw):
-        return fields.get("type", "").strip().lower() in allowed
-    f = _mark(_f, "type", f"by_types[type in {{{', '.join(sorted(allowed))}}}]")
+        return _lower_field(fields, "type").strip() in allowed
+    f = _mark(_f, "type", f"by_types[type in {{{', '.join(sorted(allowed))}}}]", COST_FIELD)
     setattr(f, "allowed_types", sorted(allowed))
     return f
 
@@ -225,87 +504,91 @@ def by_language(langs: Iterable[str]):
             men logges i språk-rapport som 'INCLUDED (missing language)'.
     """
     langs = {l.strip().lower() for l in (langs or []) if l and l.strip()}
-    if not langs: return _mark(lambda e,fd,r: True, "language", "by_language[ignored]")
+    if not langs: return _mark(lambda e,fd,r: True, "language", "by_language[ignored]", cost=COST_IGNORED)
     def _f(etype, fields, raw):
-        lang_val = fields.get('language','').strip().lower()
+        lang_val = _lower_field(fields, 'language').strip()
         if lang_val == "":   # behold manglende
             return True
         return lang_val in langs
-    f = _mark(_f, "language", f"by_language[{', '.join(sorted(langs))}]")
+    f = _mark(_f, "language", f"by_language[{', '.join(sorted(langs))}]", COST_FIELD)
     setattr(f, "allowed_langs", sorted(langs))
     return f
 
 def by_field_not_equal(field: str, value: Optional[str]):
     f = (field or "").lower().strip()
     if not f or value is None or str(value).strip() == "":
-        return _mark(lambda e,fd,r: True, f"field:{f or 'unknown'}", "by_field_not_equal[ignored]")
+        return _mark(lambda e,fd,r: True, f"field:{f or 'unknown'}", "by_field_not_equal[ignored]", cost=COST_IGNORED)
     v = str(value)
     def _f(etype, fields, raw): return fields.get(f) != v
-    return _mark(_f, f"field:{f}", f"by_field_not_equal[{f}!={v}]")
+    return _mark(_f, f"field:{f}", f"by_field_not_equal[{f}!={v}]", COST_COMPARE)
 
 def by_field_equals(field: str, value: Optional[str], case_insensitive: bool = True):
     f = (field or "").lower().strip()
     if not f or value is None or str(value).strip() == "":
-        return _mark(lambda e,fd,r: True, f"field:{f or 'unknown'}", "by_field_equals[ignored]")
+        return _mark(lambda e,fd,r: True, f"field:{f or 'unknown'}", "by_field_equals[ignored]", cost=COST_IGNORED)
     if case_insensitive:
         vv = str(value).lower()
-        def _f(etype, fields, raw): return fields.get(f, "").lower() == vv
-        return _mark(_f, f"field:{f}", f"by_field_equals[{f}=={vv} (ci)]")
+        def _f(etype, fields, raw): return _lower_field(fields, f) == vv
+        _f.ci_match = (f, "==", vv)  # kan slås sammen i any_of
+        return _mark(_f, f"field:{f}", f"by_field_equals[{f}=={vv} (ci)]", COST_COMPARE)
     else:
         vv = str(value)
         def _f(etype, fields, raw): return fields.get(f, "") == vv
-        return _mark(_f, f"field:{f}", f"by_field_equals[{f}=={vv}]")
+        return _mark(_f, f"field:{f}", f"by_field_equals[{f}=={vv}]", COST_COMPARE)
 
 def by_field_contains(field: str, needle: Optional[str], case_insensitive: bool=True):
     f = (field or "").lower().strip()
     if not f or needle is None or str(needle).strip() == "":
-        return _mark(lambda e,fd,r: True, f"field:{f or 'unknown'}", "by_field_contains[ignored]")
+        return _mark(lambda e,fd,r: True, f"field:{f or 'unknown'}", "by_field_contains[ignored]", cost=COST_IGNORED)
     nd = str(needle)
-    def _f(etype, fields, raw):
-        v = fields.get(f, "")
-        return (nd.lower() in v.lower()) if case_insensitive else (nd in v)
-    return _mark(_f, f"field:{f}", f"by_field_contains[{f}~={nd}]")
+    if case_insensitive:
+        nd_lc = nd.lower()
+        def _f(etype, fields, raw): return nd_lc in _lower_field(fields, f)
+        _f.ci_match = (f, "~=", nd_lc)  # kan slås sammen i any_of
+    else:
+        def _f(etype, fields, raw): return nd in fields.get(f, "")
+    return _mark(_f, f"field:{f}", f"by_field_contains[{f}~={nd}]", COST_COMPARE)
 
 def by_regex(field: str, pattern: Optional[str], flags: int = 0):
     f = (field or "").lower().strip()
     if not f or pattern is None or str(pattern) == "":
-        return _mark(lambda e,fd,r: True, f"regex:{f or 'unknown'}", "by_regex[ignored]")
+        return _mark(lambda e,fd,r: True, f"regex:{f or 'unknown'}", "by_regex[ignored]", cost=COST_IGNORED)
     rx = re.compile(pattern, flags)
     def _f(etype, fields, raw): return bool(rx.search(fields.get(f, "")))
-    return _mark(_f, f"regex:{f}", f"by_regex[{f}/{pattern}/]")
+    return _mark(_f, f"regex:{f}", f"by_regex[{f}/{pattern}/]", COST_REGEX)
 
 def by_has_field(field: Optional[str]):
     f = (field or "").lower().strip()
-    if not f: return _mark(lambda e,fd,r: True, "has:unknown", "by_has_field[ignored]")
+    if not f: return _mark(lambda e,fd,r: True, "has:unknown", "by_has_field[ignored]", cost=COST_IGNORED)
     def _f(etype, fields, raw): return bool(fields.get(f))
-    return _mark(_f, f"has:{f}", f"by_has_field[{f}]")
+    return _mark(_f, f"has:{f}", f"by_has_field[{f}]", COST_COMPARE)
 
 def by_searchword_min_len(min_len: Optional[int]):
-    if min_len is None or min_len <= 0: return _mark(lambda e,fd,r: True, "searchword", "by_searchword_min_len[ignored]")
+    if min_len is None or min_len <= 0: return _mark(lambda e,fd,r: True, "searchword", "by_searchword_min_len[ignored]", cost=COST_IGNORED)
     def _f(etype, fields, raw): return len(fields.get('searchword_list', [])) >= int(min_len)
-    return _mark(_f, "searchword", f"by_searchword_min_len[{min_len}]")
+    return _mark(_f, "searchword", f"by_searchword_min_len[{min_len}]", COST_COMPARE)
+
+_NO_SEARCHWORDS = frozenset()
 
 def by_searchword_has(term: Optional[str]):
-    if term is None or str(term).strip() == "": return _mark(lambda e,fd,r: True, "searchword", "by_searchword_has[ignored]")
+    if term is None or str(term).strip() == "": return _mark(lambda e,fd,r: True, "searchword", "by_searchword_has[ignored]", cost=COST_IGNORED)
     t = str(term).strip()
-    def _f(etype, fields, raw): return t in fields.get("searchword_list", [])
-    return _mark(_f, "searchword", f"by_searchword_has[{t}]")
+    def _f(etype, fields, raw): return t in fields.get("searchword_set", _NO_SEARCHWORDS)
+    return _mark(_f, "searchword", f"by_searchword_has[{t}]", COST_SCAN)
 
 def by_searchword_in(terms: Optional[Iterable[str]]):
     termset = {str(t).strip() for t in (terms or []) if str(t).strip()}
-    if not termset: return _mark(lambda e,fd,r: True, "searchword", "by_searchword_in[ignored]")
+    if not termset: return _mark(lambda e,fd,r: True, "searchword", "by_searchword_in[ignored]", cost=COST_IGNORED)
     def _f(etype, fields, raw):
-        lst = fields.get("searchword_list", [])
-        return any(t in lst for t in termset)
-    return _mark(_f, "searchword", f"by_searchword_in[{', '.join(sorted(termset))}]")
+        return not termset.isdisjoint(fields.get("searchword_set", _NO_SEARCHWORDS))
+    return _mark(_f, "searchword", f"by_searchword_in[{', '.join(sorted(termset))}]", COST_SCAN)
 
 def by_searchword_all(terms: Optional[Iterable[str]]):
     termset = {str(t).strip() for t in (terms or []) if str(t).strip()}
-    if not termset: return _mark(lambda e,fd,r: True, "searchword", "by_searchword_all[ignored]")
+    if not termset: return _mark(lambda e,fd,r: True, "searchword", "by_searchword_all[ignored]", cost=COST_IGNORED)
     def _f(etype, fields, raw):
-        lst = fields.get("searchword_list", [])
-        return all(t in lst for t in termset)
-    return _mark(_f, "searchword", f"by_searchword_all[{', '.join(sorted(termset))}]")
+        return termset.issubset(fields.get("searchword_set", _NO_SEARCHWORDS))
+    return _mark(_f, "searchword", f"by_searchword_all[{', '.join(sorted(termset))}]", COST_SCAN)
 
 def by_custom(fn: Callable[[str, Dict[str, str], str], bool]) -> Callable[[str, Dict[str, str], str], bool]:
     """Egendefinert predicate: fn(etype, fields, raw) -> bool."""
@@ -313,6 +596,120 @@ def by_custom(fn: Callable[[str, Dict[str, str], str], bool]) -> Callable[[str,
 
 
 # === HOVEDLOGIKK (med rapportering + språk-spesial) ===
+ENTRY_BATCH = 256  # entries per jobb til arbeidsprosessene
+
+def prepare_filters():
+    """
+    Bygger filtrene fra active_filters(), billigste først (en entry stoppes av det første
+    filteret den feiler), og finner evt. språkfilteret for logging av manglende språk.
+    Filtrene returneres som (filter, bucket, label), så entry-løkken slipper getattr.
+    """
+    ordered = sorted(active_filters(), key=filter_cost)
+    filters = [(flt, getattr(flt, "bucket", "other"), getattr(flt, "label", getattr(flt, "__name__", "filter")))
+               for flt in ordered]
+    language_filter = None
+    for flt in ordered:
+        if getattr(flt, "bucket", "") == "language" and hasattr(flt, "allowed_langs"):
+            language_filter = flt
+            break
+    return filters, language_filter
+
+def screen_entry(raw: str, etype: str, filters, language_filter):
+    """
+    Kjører filtrene på én entry (raw slutter med '\n', som fra skanneren).
+    Returnerer (bucket, tekst, notat), tekst/notat som UTF-8-bytes
+    (kodes her, dvs. i arbeidsprosessen, så main bare skriver bytes til filene):
+    - beholdt: bucket = None, tekst = entry til output, notat = evt. 'INCLUDED'-melding til språk-rapporten
+    - fjernet: bucket = rapport-bucket, tekst = entry til rapporten, notat = None
+    """
+    fields = _extract_cached(raw)
+
+    keep = True
+    failed_bucket = None
+    failed_filter = None
+
+    # Én try rundt hele løkken; et filter som kaster regnes som feilet (flt/bucket er da det filteret)
+    try:
+        for flt, bucket, _label in filters:
+            if not flt(etype, fields, raw):
+                keep = False
+                failed_bucket = bucket
+                failed_filter = flt
+                break
+    except Exception:
+        keep = False
+        failed_bucket = bucket
+        failed_filter = flt
+
+    if keep:
+        # Språk: hvis language mangler, behold men logg i rapporten
+        note = None
+        if language_filter is not None:
+            found_lang = fields.get('language', '').strip()
+            if found_lang == "":
+                allowed = getattr(language_filter, "allowed_langs", [])
+                comment = f"% INCLUDED (missing language): allowed in {{{', '.join(allowed)}}}; found: <missing>\n"
+                note = (comment + raw).encode('utf-8')
+
+        # Bevar 'type' = entrytype ved behov (etter filtrering)
+        raw_out = raw if fields['_has_type'] else ensure_type_field_as_class(raw, etype)
+        return None, raw_out.encode('utf-8'), note
+
+    b = failed_bucket or "other"
+    entry_txt = raw
+
+    # Språk – fjernet pga. språk ikke i allowed sett
+    if b == "language":
+        allowed = getattr(failed_filter, "allowed_langs", [])
+        found = fields.get('language', '').strip() or "<missing>"
+        comment = f"% REMOVED by language: expected in {{{', '.join(allowed)}}}; found: {found}\n"
+        entry_txt = comment + (raw if raw.startswith('@') else raw)
+
+    return b, entry_txt.encode('utf-8'), None
+
+def iter_batches(entries, size: int = ENTRY_BATCH):
+    """Grupperer (raw, etype, key) fra skanneren i lister med (raw, etype)."""
+    batch = []
+    for raw, etype, _key in entries:
+        batch.append((raw, etype))
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+_worker_filters = None
+
+def _screen_batch(batch):
+    """Kjøres i arbeidsprosess. Filtrene er closures (kan ikke pickles), så de bygges her én gang."""
+    global _worker_filters
+    if _worker_filters is None:
+        _worker_filters = prepare_filters()
+    filters, language_filter = _worker_filters
+    return [screen_entry(raw, etype, filters, language_filter) for raw, etype in batch]
+
+def screen_batches(batches, filters, language_filter):
+    """
+    Yielder resultatlistene fra screen_entry i samme rekkefølge som batchene.
+    Én batch kjøres direkte; flere fordeles på prosesser med et begrenset antall i kø.
+    """
+    first = next(batches, None)
+    if first is None:
+        return
+    second = next(batches, None)
+    if second is None:
+        yield [screen_entry(raw, etype, filters, language_filter) for raw, etype in first]
+        return
+    workers = os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        pending = deque([ex.submit(_screen_batch, first), ex.submit(_screen_batch, second)])
+        for batch in batches:
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+            pending.append(ex.submit(_screen_batch, batch))
+        while pending:
+            yield pending.popleft().result()
+
 def main():
     # Velg inputfil
     try:
@@ -325,95 +722,86 @@ def main():
     ensure_dir(REPORTS_DIR)
     output_file = make_output_path(input_file, OUTPUT_DIR)
 
-    with open(input_file, 'r', encoding='utf-8') as f:
-        content = f.read()
+    filters, language_filter = prepare_filters()
 
-    filters = active_filters()
+    # Rapporter skrives fortløpende til en midlertidig fil per bucket og får
+    # endelig navn (<base>_removed_<bucket>+<antall>.bib) når antallet er kjent.
+    base = os.path.splitext(os.path.basename(input_file))[0]
+    def partial_report_path(bucket: str) -> str:
+        return os.path.join(str(REPORTS_DIR), f"{base}_removed_{safe_name(bucket)}.partial")
 
-    kept_entries: List[str] = []
-    removed_by_bucket: Dict[str, List[str]] = {}
-    report_only_by_bucket: Dict[str, List[str]] = {}  # for "included" (ikke fjernet) meldinger
-
-    # Finn evt. språkfilter-objekt for å logge manglende språk selv om entry beholdes
-    language_filter = None
-    for flt in filters:
-        if getattr(flt, "bucket", "") == "language" and hasattr(flt, "allowed_langs"):
-            language_filter = flt
-            break
+    kept_count = 0
+    removed_count: Dict[str, int] = {}
+    report_only_count: Dict[str, int] = {}  # for "included" (ikke fjernet) meldinger
+    report_only_spool = {}  # bucket -> midlertidig fil med 'included'-meldingene
+    report_writers = {}
 
     total = 0
 
-    for raw, etype, key in iter_entries_with_raw(content):
-        total += 1
-        fields = extract_all_fields(raw)
-
-        keep = True
-        failed_bucket = None
-        failed_filter = None
-
-        for flt in filters:
+    # Utdata skrives også til en midlertidig fil; ved feil fjernes alle halvskrevne
+    # filer, så ingenting blir liggende igjen før screeningen er ferdig (som før)
+    output_partial = output_file + ".partial"
+    try:
+        with ExitStack() as stack:
+            f = stack.enter_context(open(input_file, 'r', encoding='utf-8'))
+            out = stack.enter_context(open(output_partial, 'wb'))
+
+            def report_writer(bucket: str):
+                w = report_writers.get(bucket)
+                if w is None:
+                    w = report_writers[bucket] = stack.enter_context(
+                        open(partial_report_path(bucket), 'wb'))
+                return w
+
+            def report_only_writer(bucket: str):
+                w = report_only_spool.get(bucket)
+                if w is None:
+                    w = report_only_spool[bucket] = stack.enter_context(tempfile.TemporaryFile())
+                return w
+
+            batches = iter_batches(iter_entries_from_stream(f))
+            for results in screen_batches(batches, filters, language_filter):
+                for bucket, text, note in results:
+                    total += 1
+                    if bucket is None:
+                        if note is not None:
+                            report_only_writer("language").write(note)
+                            report_only_count["language"] = report_only_count.get("language", 0) + 1
+                        # passerte entries skrives med én blank linje imellom (kun entries, uten mellomtekst)
+                        if kept_count:
+                            out.write(b'\n')
+                        out.write(text)
+                        kept_count += 1
+                    else:
+                        report_writer(bucket).write(text)
+                        removed_count[bucket] = removed_count.get(bucket, 0) + 1
+
+            # 'report-only' kommer etter de fjernede i samme bucket-rapport
+            for bucket, spool in report_only_spool.items():
+                spool.seek(0)
+                shutil.copyfileobj(spool, report_writer(bucket))
+    except BaseException:
+        for path in [output_partial, *map(partial_report_path, report_writers)]:
             try:
-                if not flt(etype, fields, raw):
-                    keep = False
-                    failed_bucket = getattr(flt, "bucket", "other")
-                    failed_filter = flt
-                    break
-            except Exception:
-                keep = False
-                failed_bucket = getattr(flt, "bucket", "other")
-                failed_filter = flt
-                break
-
-        if keep:
-            # Språk: hvis language mangler, behold men logg i rapporten
-            if language_filter is not None:
-                found_lang = fields.get('language', '').strip()
-                if found_lang == "":
-                    allowed = getattr(language_filter, "allowed_langs", [])
-                    comment = f"% INCLUDED (missing language): allowed in {{{', '.join(allowed)}}}; found: <missing>\n"
-                    report_only_by_bucket.setdefault("language", []).append(
-                        comment + (raw if raw.endswith('\n') else raw + '\n')
-                    )
-
-            # Bevar 'type' = entrytype ved behov (etter filtrering)
-            raw_out = ensure_type_field_as_class(raw, etype)
-            kept_entries.append(raw_out if raw_out.endswith('\n') else (raw_out + '\n'))
-
-        else:
-            b = failed_bucket or "other"
-            entry_txt = raw
-
-            # Språk – fjernet pga. språk ikke i allowed sett
-            if b == "language":
-                allowed = getattr(failed_filter, "allowed_langs", [])
-                found = fields.get('language', '').strip() or "<missing>"
-                comment = f"% REMOVED by language: expected in {{{', '.join(allowed)}}}; found: {found}\n"
-                entry_txt = comment + (raw if raw.startswith('@') else raw)
-
-            removed_by_bucket.setdefault(b, []).append(entry_txt if entry_txt.endswith('\n') else (entry_txt + '\n'))
-
-    # Skriv passerte entries (kun entries, uten mellomtekst)
-    with open(output_file, 'w', encoding='utf-8', newline='') as f:
-        f.write('\n'.join(kept_entries))
-
-    # Skriv bib-rapporter per bucket (kombiner 'removed' + 'report-only')
-    base = os.path.splitext(os.path.basename(input_file))[0]
-    def safe_name(s: str) -> str:
-        return re.sub(r'[^\w\-\+\.]+', '_', s).strip('_')
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        raise
+    os.replace(output_partial, output_file)
 
-    all_buckets = set(removed_by_bucket.keys()) | set(report_only_by_bucket.keys())
-    total_removed = sum(len(v) for v in removed_by_bucket.values())
+    # Gi bib-rapportene endelig navn per bucket (kombiner 'removed' + 'report-only')
+    all_buckets = set(report_writers)
+    total_removed = sum(removed_count.values())
 
     for bucket in sorted(all_buckets):
-        entries = (removed_by_bucket.get(bucket, []) + report_only_by_bucket.get(bucket, []))
-        out_path = os.path.join(str(REPORTS_DIR), f"{base}_removed_{safe_name(bucket)}+{len(entries)}.bib")
-        with open(out_path, 'w', encoding='utf-8', newline='') as f:
-            f.write(''.join(entries))
-        print(f"[OK] Report ({bucket}): {len(entries)} -> {out_path}")
+        n_entries = removed_count.get(bucket, 0) + report_only_count.get(bucket, 0)
+        out_path = os.path.join(str(REPORTS_DIR), f"{base}_removed_{safe_name(bucket)}+{n_entries}.bib")
+        os.replace(partial_report_path(bucket), out_path)
+        print(f"[OK] Report ({bucket}): {n_entries} -> {out_path}")
 
     print(f"[OK] Input:  {input_file}")
     print(f"[OK] Output (kept): {output_file}")
-    print(f"[SUM] Total: {total} | Kept: {len(kept_entries)} | Removed: {total_removed} | Buckets: {len(all_buckets)}")
+    print(f"[SUM] Total: {total} | Kept: {kept_count} | Removed: {total_removed} | Buckets: {len(all_buckets)}")
 
 if __name__ == "__main__":
     main()
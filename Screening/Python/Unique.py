@@ -14,13 +14,18 @@ BibTeX merger & deduper (DOI -> Title(+Year) -> Abstract) + BibTeX-rapport:
 """
 
 import os
-import glob
+import hashlib
 from pathlib import Path
 import re
 import html
 import unicodedata
 from urllib.parse import unquote
-from collections import Counter, defaultdict
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from operator import itemgetter
+
+from bibtex import iter_entries, read_text
 
 # -------- PROSJEKTSTIER (relativt til denne fila) --------
 # Prosjektrot = mappa som inneholder "Python", "2.BibTex_clean_ISSN", "3.Unique", "Reports", ...
@@ -36,8 +41,24 @@ OUTPUT_FILE = "merged_unique.bib"
 REPORT_DIR  = ROOT_DIR / "Reports"
 REPORT_FILE = "unique_report.bib"  # BibTeX-rapport
 
-ENTRY_START_RE = re.compile(r'@(?P<type>[A-Za-z]+)\s*\{', re.M)
+WRITE_BUFFER = 1 << 20  # skrivebuffer for output/rapport (mange små write-kall)
+
 DOI_RE = re.compile(r'\b10\.\d{4,9}/\S+\b', re.I)
+# Linje som starter med "navn =" (evt. fulgt av { eller "), for parse_entry. Whitespace etter '='
+# tas bare med når verdien starter med {/", så ingen linjestart med et nytt felt blir hoppet over.
+FIELD_LINE_RE = re.compile(r'^\s*([^\s=]+)\s*=(?:\s*([{"]))?', re.M)
+FIELD_HEAD_RE = re.compile(r'\s*([^\s=]+)\s*=')
+
+# Normalisering (_norm_text/_strip_latex/_normalize_doi): kompileres én gang
+BRACES_DEL = str.maketrans('', '', '{}')
+HTML_TAG_RE = re.compile(r'<[^>]*>')
+LATEX_CMD_RE = re.compile(r'\\[a-zA-Z]+(\{[^{}]*\})?')
+# Skilletegn og whitespace i én klasse: et løp av begge blir ett mellomrom i én pass
+PUNCT_WS_RE = re.compile(r'[\.,;:\-\–\—\(\)\[\]\"\'`´’“”/\\_~!?\|\+&^%$#@*=<>\s]+')
+DOI_URL_RE = re.compile(r'(?:https?://)?(?:dx\.)?doi\.org/([^?\s]+)', re.I)
+DOI_URL_PREFIX_RE = re.compile(r'^(https?://)?(dx\.)?doi\.org/')
+DOI_LABEL_RE = re.compile(r'^\s*doi:\s*')
+YEAR_RE = re.compile(r'\d{4}')
 
 # ---------- Hjelpefunksjoner ----------
 def split_filename_parts(fp: str):
@@ -52,62 +73,119 @@ def split_filename_parts(fp: str):
         return (left.strip() or "unknown"), (right.strip() or "unknown")
     return (base.strip() or "unknown"), None
 
-def extract_entries(text: str):
+def _header_span(entry_text: str) -> tuple[int, int]:
     """
-    Del rå BibTeX-tekst i komplette entries ved balansering av klammer.
-    Returnerer liste med entry-tekster.
+    (posisjon til første '{', posisjon rett etter kommaet i headeren @type{ID,).
+    Begge -1 hvis '{' mangler; den andre -1 hvis kommaet mangler.
     """
-    entries = []
-    i = 0
-    n = len(text)
-    while True:
-        m = ENTRY_START_RE.search(text, i)
-        if not m:
-            break
-        start = m.start()
-        brace_open = text.find("{", m.end() - 1)
-        if brace_open == -1:
-            break
-        depth = 0
-        j = brace_open
-        while j < n:
-            c = text[j]
-            if c == "{":
-                depth += 1
-            elif c == "}":
-                depth -= 1
-                if depth == 0:
-                    end = j + 1
-                    entries.append(text[start:end])
-                    i = end
-                    break
-            j += 1
-        else:
-            entries.append(text[start:n])
-            i = n
-    return entries
+    first_brace = entry_text.find("{")
+    if first_brace == -1:
+        return -1, -1
+    comma = entry_text.find(",", first_brace + 1)
+    return first_brace, (comma + 1 if comma != -1 else -1)
+
+def _common_indent(body: str) -> str:
+    """
+    Mest brukte innrykk (whitespace) blant feltlinjene i body.
+    Fallback: "" (ingen innrykk).
+    """
+    counts = Counter()
+    for line in body.splitlines():
+        stripped = line.lstrip()
+        if stripped and "=" in line:
+            counts[line[:len(line) - len(stripped)]] += 1
+    if not counts:
+        return ""
+    max_count = max(counts.values())
+    candidates = [i for i, c in counts.items() if c == max_count]
+    return min(candidates, key=len)
+
+def parse_entry(entry_text: str) -> dict:
+    """
+    Leser en entry én gang (én FIELD_LINE_RE-gjennomgang i stedet for ett regex-søk per felt):
+      "id"         -> BibTeX-ID fra header (None hvis header mangler komma)
+      "fields"     -> {feltnavn (lowercase): verdi}; som før vinner første {…}-verdi
+                      over første "…"-verdi, og {…} går til første '}'
+      "indent"     -> mest brukte innrykk blant feltlinjene
+      "newline"    -> linjeskift som brukes ved innsetting
+      "has_source" -> om body har en linje som starter med 'source ='
+      "last_brace" -> posisjon til siste '}' (len(entry_text) hvis den mangler)
+      "tail"       -> True hvis '}' mangler, eller header-kommaet eller slutten på en feltverdi
+                      ligger ved/etter siste '}' (da kan innsettingen endre dem, se fields_after_append)
+    Et felt teller bare når navnet står først på en linje (evt. etter whitespace).
+    """
+    n = len(entry_text)
+    # header og siste '}' finnes én gang her; alt senere (innrykk, innsetting) bruker posisjonene
+    first_brace, after_header = _header_span(entry_text)
+    bib_id = entry_text[first_brace + 1:after_header - 1].strip() if after_header != -1 else None
+    body_start = max(after_header, 0)
+    last_brace = entry_text.rfind("}")
+    if last_brace == -1:
+        last_brace = n
+
+    braced: dict[str, str] = {}
+    quoted: dict[str, str] = {}
+    has_source = False
+    tail = after_header > last_brace or last_brace == n
+    if 0 < body_start < n and entry_text[body_start - 1] != "\n":
+        # body starter midt på linjen, men teller som linjestart for 'source'-sjekken
+        m = FIELD_HEAD_RE.match(entry_text, body_start)
+        has_source = m is not None and m.group(1).lower() == "source"
+    for m in FIELD_LINE_RE.finditer(entry_text):
+        name, opener = m.groups()
+        name = name.lower()
+        if name == "source" and m.start() >= body_start:
+            has_source = True
+        if opener is None:
+            continue
+        close = entry_text.find("}" if opener == "{" else '"', m.end())
+        if close == -1:
+            continue
+        if close >= last_brace:
+            tail = True
+        target = braced if opener == "{" else quoted
+        if name not in target:
+            target[name] = entry_text[m.end():close].strip()
+
+    quoted.update(braced)
+    return {
+        "id": bib_id,
+        "fields": quoted,
+        "indent": _common_indent(entry_text[body_start:last_brace]),
+        "newline": "\n" if "\n" in entry_text else "\r\n",
+        "has_source": has_source,
+        "last_brace": last_brace,
+        "tail": tail,
+    }
 
 def get_field(entry_text: str, field: str) -> str | None:
     """
     Robust feltleser som tåler CRLF, trailing komma, linebreaks i verdien, {…} eller "…".
     """
-    m = re.search(rf'(?im)^\s*{re.escape(field)}\s*=\s*\{{(.*?)\}}\s*,?', entry_text, flags=re.S)
-    if m:
-        return m.group(1).strip()
-    m = re.search(rf'(?im)^\s*{re.escape(field)}\s*=\s*"(.*?)"\s*,?', entry_text, flags=re.S)
-    if m:
-        return m.group(1).strip()
-    return None
+    return parse_entry(entry_text)["fields"].get(field.lower())
 
+@lru_cache(maxsize=65536)
 def _strip_latex(s: str) -> str:
-    s = re.sub(r'\\[a-zA-Z]+(\{[^{}]*\})?', ' ', s)
+    s = LATEX_CMD_RE.sub(' ', s)
     s = s.replace(r'\&', '&').replace(r'\/', '/').replace(r'\%', '%')
     return s
 
-def _fold_accents(s: str) -> str:
+def _fold_nfkd(s: str) -> str:
     nfkd = unicodedata.normalize('NFKD', s)
     return ''.join(ch for ch in nfkd if not unicodedata.combining(ch))
 
+# Ferdig foldede tegn for Latin-1/Latin Extended-A/B (U+00C0–U+024F), laget med samme
+# NFKD-regel. Foldingen virker tegn for tegn (kombinerende tegn fjernes uansett), så
+# translate + ev. NFKD på resten gir samme resultat som NFKD på hele strengen.
+_FOLD_MAP = {cp: f for cp in range(0xC0, 0x250) if (f := _fold_nfkd(chr(cp))) != chr(cp)}
+
+def _fold_accents(s: str) -> str:
+    s = s.translate(_FOLD_MAP)
+    if s.isascii():
+        return s
+    return _fold_nfkd(s)
+
+@lru_cache(maxsize=65536)
 def _norm_text(s: str) -> str:
     """
     Robust normalisering for tittel/abstract/år:
@@ -120,15 +198,17 @@ def _norm_text(s: str) -> str:
         return ""
     s = html.unescape(s)
     s = unquote(s)
-    s = re.sub(r'\{|\}', '', s)
-    s = re.sub(r'<[^>]*>', ' ', s)
-    s = _strip_latex(s)
+    s = s.translate(BRACES_DEL)
+    # Passene under er no-ops uten sitt starttegn, så de hoppes over da
+    if '<' in s:
+        s = HTML_TAG_RE.sub(' ', s)
+    if '\\' in s:
+        s = _strip_latex(s)
     s = _fold_accents(s)
     s = s.lower()
-    s = re.sub(r'[\.,;:\-\–\—\(\)\[\]\"\'`´’“”/\\_~!?\|\+&^%$#@*=<>]', ' ', s)
-    s = re.sub(r'\s+', ' ', s).strip()
-    return s
+    return PUNCT_WS_RE.sub(' ', s).strip()
 
+@lru_cache(maxsize=65536)
 def _normalize_doi(raw: str) -> str | None:
     """
     Normaliser DOI:
@@ -141,196 +221,230 @@ def _normalize_doi(raw: str) -> str | None:
         return None
     raw = html.unescape(raw)
     raw = unquote(raw)
+    # En gyldig DOI begynner med "10."; utover prefikser foran og tegn bak fjernes bare
+    # mellomrom, så uten "10." i verdien (mellomrom bort) kan ingen regex treffe
+    if "10." not in raw.replace(" ", ""):
+        return None
     m = DOI_RE.search(raw)
     if m:
         doi = m.group(0)
     else:
-        m = re.search(r'(?:https?://)?(?:dx\.)?doi\.org/([^?\s]+)', raw, re.I)
+        m = DOI_URL_RE.search(raw)
         if m:
             doi = m.group(1)
         else:
             doi = raw
     doi = doi.strip().lower()
     doi = doi.rstrip(' .;,')
-    doi = re.sub(r'^(https?://)?(dx\.)?doi\.org/', '', doi)
-    doi = re.sub(r'^\s*doi:\s*', '', doi)
+    doi = DOI_URL_PREFIX_RE.sub('', doi)
+    doi = DOI_LABEL_RE.sub('', doi)
     doi = doi.replace(' ', '')
     return doi if DOI_RE.match(doi) else None
 
-def _find_normalized_doi(entry_text: str) -> str | None:
-    doi_field = _normalize_doi(get_field(entry_text, 'doi'))
-    if doi_field:
-        return doi_field
-    url_field = _normalize_doi(get_field(entry_text, 'url'))
-    return url_field
-
-def has_source_field(entry_text: str) -> bool:
-    try:
-        first_brace = entry_text.index("{")
-        after_header = entry_text.index(",", first_brace + 1) + 1
-    except ValueError:
-        after_header = 0
-    body = entry_text[after_header:]
-    return re.search(r'(?im)^\s*source\s*=', body) is not None
-
-def detect_common_field_indent(entry_text: str) -> str:
-    """
-    Finn mest brukte innrykk (whitespace) blant feltlinjene i body.
-    Fallback: "" (ingen innrykk).
-    """
-    try:
-        first_brace = entry_text.index("{")
-        after_header = entry_text.index(",", first_brace + 1) + 1
-    except ValueError:
-        after_header = 0
-    last_brace = entry_text.rfind("}")
-    if last_brace == -1:
-        last_brace = len(entry_text)
-    body = entry_text[after_header:last_brace]
-    lines = body.splitlines()
-    indents = []
-    for line in lines:
-        if not line.strip():
-            continue
-        if "=" in line:
-            m = re.match(r'^(\s*)', line)
-            indents.append(m.group(1) if m else "")
-    if not indents:
-        return ""
-    counts = Counter(indents)
-    max_count = max(counts.values())
-    candidates = [i for i, c in counts.items() if c == max_count]
-    return min(candidates, key=len)
-
-def append_fields(entry_text: str, actual_search: str, source_val: str | None) -> str:
+def append_fields(entry_text: str, actual_search: str, source_val: str | None,
+                  parsed: dict | None = None) -> str:
     """
     Legg til 'source' (hvis mangler) og alltid 'actualSearch' nederst rett før '}'.
+    parsed = parse_entry(entry_text), hvis den allerede er laget.
     """
-    last_brace = entry_text.rfind("}")
-    if last_brace == -1:
-        last_brace = len(entry_text)
-        closing = ""
-    else:
-        closing = "}"
+    if parsed is None:
+        parsed = parse_entry(entry_text)
+    return join_entry((entry_text, parsed["last_brace"],
+                       appended_text(parsed, actual_search, source_val)))
 
-    indent = detect_common_field_indent(entry_text)
-    newline = "\n" if "\n" in entry_text else "\r\n"
+def appended_text(parsed: dict, actual_search: str, source_val: str | None) -> str:
+    """Feltlinjene append_fields setter inn ved parsed["last_brace"] (rett før '}')."""
+    indent = parsed["indent"]
+    newline = parsed["newline"]
 
     to_insert = ""
-    if source_val and not has_source_field(entry_text):
+    if source_val and not parsed["has_source"]:
         to_insert += f"{indent}source = {{{source_val}}},{newline}"
     to_insert += f"{indent}actualSearch = {{{actual_search}}}{newline}"
-
-    return entry_text[:last_brace] + to_insert + closing + entry_text[last_brace+1:]
-
-def get_bibtex_id(entry_text: str) -> str:
+    return to_insert
+
+# Oppdatert entry som (original tekst, innsettingsposisjon, innsatt tekst): den fulle
+# teksten settes sammen først ved utskrift, i stedet for én ny streng per entry.
+def join_entry(entry: tuple[str, int, str]) -> str:
+    text, cut, insert = entry
+    return text[:cut] + insert + text[cut:]
+
+def write_entry(f, entry: tuple[str, int, str]):
+    text, cut, insert = entry
+    f.write(text[:cut])
+    f.write(insert)
+    f.write(text[cut:])
+
+def fields_after_append(entry_text: str, parsed: dict, actual_search: str,
+                        source_val: str | None) -> dict | None:
     """
-    Henter BibTeX-ID fra header: @type{ID, ...
+    Feltene til append_fields(entry_text, ...) avledet fra parse_entry(entry_text), uten ny parsing.
+    Returnerer None når innsettingen kan endre andre verdier enn 'source' (parsed["tail"],
+    header uten komma, klammer/anførselstegn/linjeskift i de innsatte verdiene,
+    eller 'source' som finnes fra før); da må den oppdaterte teksten parses på nytt.
     """
-    try:
-        first_brace = entry_text.index("{")
-        comma = entry_text.index(",", first_brace + 1)
-        return entry_text[first_brace+1:comma].strip()
-    except ValueError:
-        return ""
+    if parsed["tail"] or parsed["id"] is None:
+        return None
+    for val in (actual_search, source_val or ""):
+        if "{" in val or "}" in val or '"' in val or "\n" in val:
+            return None
+    fields = parsed["fields"]
+    if source_val and not parsed["has_source"]:
+        if "source" in fields:
+            return None
+        # innsatt 'source' er bare et felt når den havner først på en linje
+        last_brace = parsed["last_brace"]
+        line_start = entry_text.rfind("\n", 0, last_brace) + 1
+        if not entry_text[line_start:last_brace].strip():
+            fields = dict(fields)
+            fields["source"] = source_val.strip()
+    return fields
 
 # ---------- Dedup-nøkkel ----------
-def build_dedupe_key(entry_text: str) -> tuple[str, str]:
+@lru_cache(maxsize=65536)
+def _dedupe_key(doi_raw: str | None, url_raw: str | None, title: str | None,
+                year: str | None, abstract: str | None) -> tuple[str, str] | None:
     """
-    Returnerer (strategi, nøkkel) i prioritert rekkefølge:
-      'DOI'         -> normalisert DOI
-      'TITLE_YEAR'  -> "<norm_title>::<year>"
-      'TITLE'       -> "<norm_title>"
-      'ABSTRACT'    -> "<norm_abstract>"
-      'FALLBACK'    -> "<norm_body>"
+    (strategi, nøkkel) ut fra feltverdiene; None -> FALLBACK (trenger hele entry-teksten).
+    Cachet på de rå verdiene, siden duplikater fra flere søk har like felter.
     """
-    doi = _find_normalized_doi(entry_text)
+    doi = _normalize_doi(doi_raw) or _normalize_doi(url_raw)
     if doi:
         return ('DOI', doi)
 
-    title = get_field(entry_text, 'title')
     if title:
         t_norm = _norm_text(title)
-        year = get_field(entry_text, 'year')
         if year:
-            y = re.search(r'\d{4}', year)
+            y = YEAR_RE.search(year)
             if y:
                 return ('TITLE_YEAR', f"{t_norm}::{y.group(0)}")
         return ('TITLE', t_norm)
 
-    abstract = get_field(entry_text, 'abstract')
     if abstract:
         return ('ABSTRACT', _norm_text(abstract))
+    return None
+
+def dedupe_key_from_fields(fields: dict) -> tuple[str, str] | None:
+    """Som build_dedupe_key, men None der den ville falt tilbake til FALLBACK."""
+    return _dedupe_key(fields.get('doi'), fields.get('url'), fields.get('title'),
+                       fields.get('year'), fields.get('abstract'))
+
+def build_dedupe_key(entry_text: str, fields: dict | None = None) -> tuple[str, str]:
+    """
+    Returnerer (strategi, nøkkel) i prioritert rekkefølge:
+      'DOI'         -> normalisert DOI
+      'TITLE_YEAR'  -> "<norm_title>::<year>"
+      'TITLE'       -> "<norm_title>"
+      'ABSTRACT'    -> "<norm_abstract>"
+      'FALLBACK'    -> "<norm_body>"
+    fields = parse_entry(entry_text)["fields"], hvis den allerede er laget.
+    """
+    if fields is None:
+        fields = parse_entry(entry_text)["fields"]
+    key = dedupe_key_from_fields(fields)
+    if key is not None:
+        return key
 
     # Siste utvei (bør sjelden skje dersom tittel/abstract finnes)
     return ('FALLBACK', _norm_text(entry_text))
 
 # ---------- Prosessering + rapport ----------
+def parse_bib_file(fp: str) -> list[tuple[tuple[str, int, str], dict]]:
+    """
+    Leser én .bib-fil og gjør alt arbeid per entry som ikke avhenger av andre filer:
+    legger til felter nederst og bygger dedup-nøkkel. Returnerer [(oppdatert entry, metadata)],
+    der oppdatert entry er på join_entry-formen.
+    Kjøres i arbeidsprosess når det er flere filer.
+    """
+    text = read_text(fp, encoding="utf-8-sig")
+    actual_search, source_from_name = split_filename_parts(fp)
+    file_name = os.path.basename(fp)
+    out = []
+    for entry_text in iter_entries(text):
+        # legg til felter nederst (beholder rekkefølge ellers); entryen parses én gang
+        parsed = parse_entry(entry_text)
+        updated = (entry_text, parsed["last_brace"],
+                   appended_text(parsed, actual_search, source_from_name))
+        fields = fields_after_append(entry_text, parsed, actual_search, source_from_name)
+        if fields is None:
+            parsed = parse_entry(join_entry(updated))
+            fields = parsed["fields"]
+
+        strategy, key = (dedupe_key_from_fields(fields)
+                         or ('FALLBACK', _norm_text(join_entry(updated))))
+        # 16-byte digest som gruppenøkkel: korte, raske sammenlikninger i stedet for hele teksten
+        key_hash = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        out.append((updated, {
+            "file": file_name,
+            "bib_id": parsed["id"] or "",
+            "title_raw": fields.get('title') or "",
+            "year": fields.get('year') or "",
+            "source": fields.get('source') or (source_from_name or ""),
+            "actualSearch": actual_search,
+            "strategy": strategy,
+            "key": key,
+            "key_hash": key_hash,
+        }))
+    return out
+
 def main():
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     REPORT_DIR.mkdir(parents=True, exist_ok=True)
 
-    bib_files = sorted(glob.glob(str(INPUT_DIR / "*.bib")))
+    bib_files = sorted(e.path for e in os.scandir(INPUT_DIR) if e.name.endswith(".bib") and e.is_file())
     if not bib_files:
         print(f"Fant ingen .bib-filer i: {INPUT_DIR}")
         return
 
-    # Telle totalt før fjerning
-    total_before = 0
-    raw_entries_per_file: dict[str, list[str]] = {}
-    for fp in bib_files:
-        with open(fp, "r", encoding="utf-8-sig") as f:
-            text = f.read()
-        entries = extract_entries(text)
-        raw_entries_per_file[fp] = entries
-        total_before += len(entries)
-
-    # Prosess: legg til felter, bygg grupper etter dedup-nøkkel, og behold kun første pr. nøkkel
-    groups: dict[tuple[str, str], list[dict]] = defaultdict(list)  # (strategy, key) -> list of items
-    seen_keys: set[tuple[str, str]] = set()
-    merged_entries: list[str] = []
-
-    for fp in bib_files:
-        actual_search, source_from_name = split_filename_parts(fp)
-        for entry_text in raw_entries_per_file[fp]:
-            # legg til felter nederst (beholder rekkefølge ellers)
-            updated = append_fields(entry_text, actual_search, source_from_name)
-
-            strategy, key = build_dedupe_key(updated)
-            title_raw = get_field(updated, 'title') or ""
-            year = get_field(updated, 'year') or ""
-            source_field = get_field(updated, 'source') or (source_from_name or "")
-            bib_id = get_bibtex_id(updated)
-
-            item = {
-                "kept": False,           # settes under
-                "file": os.path.basename(fp),
-                "bib_id": bib_id,
-                "title_raw": title_raw,
-                "year": year,
-                "source": source_field,
-                "actualSearch": actual_search,
-                "strategy": strategy,
-                "key": key,
-                "entry_text": updated,   # FULL entry-tekst (etter felttillegg)
-            }
-
-            if (strategy, key) in seen_keys:
-                item["kept"] = False
-            else:
-                item["kept"] = True
-                seen_keys.add((strategy, key))
-                merged_entries.append(updated)
-
-            groups[(strategy, key)].append(item)
+    # Les og parse filene (uavhengige, CPU-tunge) – i parallell når det er flere filer.
+    # Resultatene kommer i samme rekkefølge som bib_files.
+    if len(bib_files) == 1:
+        parsed_files = [parse_bib_file(bib_files[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=min(len(bib_files), os.cpu_count() or 1)) as ex:
+            parsed_files = list(ex.map(parse_bib_file, bib_files))
 
+    # Telle totalt før fjerning
+    total_before = sum(len(pf) for pf in parsed_files)
+
+    # Behold første entry pr. dedup-nøkkel. Grupper bygges bare for nøkler som faktisk
+    # får duplikater; entry-tekstene ligger én gang i entries_list og refereres med indeks.
+    entries_list: list[tuple[str, int, str]] = []   # entry etter felttillegg (join_entry-form)
+    items: list[dict] = []         # metadata per entry, samme indeks som entries_list
+    first_occurrence: dict[tuple[str, bytes], int] = {}  # (strategy, key_hash) -> beholdt indeks
+    groups: dict[tuple[str, bytes], list[int]] = {}      # kun duplikater: indekser, første = beholdt
+    group_keys: dict[int, str] = {}  # beholdt indeks -> normalisert nøkkel, bare for rapporten
+
+    for pf in parsed_files:
+        for updated, item in pf:
+            idx = len(entries_list)
+            entries_list.append(updated)
+            items.append(item)
+
+            key = item.pop("key")
+            sk = (item["strategy"], item.pop("key_hash"))
+            first = first_occurrence.setdefault(sk, idx)
+            if first != idx:
+                group = groups.get(sk)
+                if group is None:
+                    groups[sk] = [first, idx]
+                    group_keys[first] = key
+                else:
+                    group.append(idx)
+    del parsed_files
+
+    # Beholdte entries = første pr. nøkkel, i rekkefølgen nøklene først ble sett
+    merged_entries = [entries_list[i] for i in first_occurrence.values()]
     total_after = len(merged_entries)
     removed = total_before - total_after
 
-    # Skriv ut merged
+    # Skriv ut merged (strømmes entry for entry, stor skrivebuffer)
     out_path = OUTPUT_DIR / OUTPUT_FILE
-    with open(out_path, "w", encoding="utf-8") as f:
-        f.write(("\n\n").join(merged_entries))
+    with open(out_path, "w", encoding="utf-8", buffering=WRITE_BUFFER) as f:
+        for n, e in enumerate(merged_entries):
+            if n:
+                f.write("\n\n")
+            write_entry(f, e)
         f.write("\n")
 
     print(f"Totalt før fjerning: {total_before}")
@@ -338,55 +452,66 @@ def main():
     print(f"Gikk igjennom (unik): {total_after}")
     print(f"Lagret som: {out_path}")
 
-    # Bygg BibTeX-rapport: kun grupper med >1 element (faktiske duplikater)
-    dup_groups = [ (k, v) for k, v in groups.items() if len(v) > 1 ]
-    # sorter: først etter strategi (i prioritert rekkefølge), så etter gruppestørrelse synkende
+    # Bygg BibTeX-rapport: groups har bare faktiske duplikater
+    # sorter: først etter strategi (i prioritert rekkefølge), så etter gruppestørrelse synkende,
+    # og ellers i rekkefølgen gruppen først ble sett (indeksen til beholdt entry).
+    # Én bøtte pr. strategi; hver bøtte sorteres med C-nøkler (stabilt, også med reverse).
     strat_order = {'DOI': 0, 'TITLE_YEAR': 1, 'TITLE': 2, 'ABSTRACT': 3, 'FALLBACK': 4}
-    dup_groups.sort(key=lambda kv: (strat_order.get(kv[0][0], 9), -len(kv[1])))
-
-    report_lines = []
-    report_lines.append("% UNIQUE REPORT – grupper av like (dedupe-strategi) (BibTeX-format)")
-    report_lines.append(f"% Input-mappe : {INPUT_DIR}")
-    report_lines.append(f"% Antall entries totalt: {total_before}")
-    report_lines.append(f"% Fjernet som duplikater: {removed}")
-    report_lines.append(f"% Antall unike (beholdt): {total_after}")
-    report_lines.append(f"% Antall duplikat-grupper: {len(dup_groups)}")
-    report_lines.append("% ---------------------------------")
-
-    for idx, ((strategy, key), items) in enumerate(dup_groups, start=1):
-        # Vis et eksempel på tittel hvis finnes
-        example_title = next((it["title_raw"] for it in items if it["title_raw"]), "")
-        report_lines.append(f"% Gruppe {idx}  (antall: {len(items)})  [Strategi: {strategy}]")
-        if strategy == 'DOI':
-            report_lines.append(f"% Nøkkel (DOI): {key}")
-        elif strategy == 'TITLE_YEAR':
-            tpart, ypart = key.split("::", 1) if "::" in key else (key, "")
-            report_lines.append(f"% Nøkkel (TITLE_YEAR): <normalisert tittel> + år={ypart}")
-        elif strategy == 'TITLE':
-            report_lines.append(f"% Nøkkel (TITLE): <normalisert tittel>")
-        elif strategy == 'ABSTRACT':
-            report_lines.append(f"% Nøkkel (ABSTRACT): <normalisert abstract>")
-        else:
-            report_lines.append(f"% Nøkkel (FALLBACK)")
-        if example_title:
-            report_lines.append(f"% Tittel (eksempel): {example_title}")
-
-        for j, it in enumerate(items, start=1):
-            status = "BEHOLDT" if it["kept"] else "FJERNET"
-            report_lines.append(
-                f"% --- {j:02d}. [{status}]  ID={it['bib_id']}  År={it['year']}  "
-                f"Kilde={it['source']}  Fil={it['file']}"
-            )
-            # Hele BibTeX-entryen (etter felttillegg):
-            report_lines.append(it["entry_text"].rstrip())
-            report_lines.append("")  # tom linje mellom entries i samme gruppe
-
-        report_lines.append("% ---------------------------------")  # separator mellom grupper
-
-    # Skriv rapport
+    buckets: list[list[list[int]]] = [[] for _ in range(len(strat_order) + 1)]  # siste: ukjent
+    for (strategy, _), members in groups.items():
+        buckets[strat_order.get(strategy, len(strat_order))].append(members)
+    dup_groups: list[list[int]] = []
+    for bucket in buckets:
+        bucket.sort(key=itemgetter(0))
+        bucket.sort(key=len, reverse=True)
+        dup_groups.extend(bucket)
+
+    # Rapporten skrives linje for linje rett til fil i stedet for å samles i en liste
     report_path = REPORT_DIR / REPORT_FILE
-    with open(report_path, "w", encoding="utf-8") as f:
-        f.write("\n".join(report_lines) + "\n")
+    with open(report_path, "w", encoding="utf-8", buffering=WRITE_BUFFER) as f:
+        def report_line(line: str):
+            f.write(line)
+            f.write("\n")
+
+        report_line("% UNIQUE REPORT – grupper av like (dedupe-strategi) (BibTeX-format)")
+        report_line(f"% Input-mappe : {INPUT_DIR}")
+        report_line(f"% Antall entries totalt: {total_before}")
+        report_line(f"% Fjernet som duplikater: {removed}")
+        report_line(f"% Antall unike (beholdt): {total_after}")
+        report_line(f"% Antall duplikat-grupper: {len(dup_groups)}")
+        report_line("% ---------------------------------")
+
+        for idx, members in enumerate(dup_groups, start=1):
+            strategy, key = items[members[0]]["strategy"], group_keys[members[0]]
+            # Vis et eksempel på tittel hvis finnes
+            example_title = next((items[m]["title_raw"] for m in members if items[m]["title_raw"]), "")
+            report_line(f"% Gruppe {idx}  (antall: {len(members)})  [Strategi: {strategy}]")
+            if strategy == 'DOI':
+                report_line(f"% Nøkkel (DOI): {key}")
+            elif strategy == 'TITLE_YEAR':
+                tpart, ypart = key.split("::", 1) if "::" in key else (key, "")
+                report_line(f"% Nøkkel (TITLE_YEAR): <normalisert tittel> + år={ypart}")
+            elif strategy == 'TITLE':
+                report_line(f"% Nøkkel (TITLE): <normalisert tittel>")
+            elif strategy == 'ABSTRACT':
+                report_line(f"% Nøkkel (ABSTRACT): <normalisert abstract>")
+            else:
+                report_line(f"% Nøkkel (FALLBACK)")
+            if example_title:
+                report_line(f"% Tittel (eksempel): {example_title}")
+
+            for j, m in enumerate(members, start=1):
+                it = items[m]
+                status = "BEHOLDT" if j == 1 else "FJERNET"
+                report_line(
+                    f"% --- {j:02d}. [{status}]  ID={it['bib_id']}  År={it['year']}  "
+                    f"Kilde={it['source']}  Fil={it['file']}"
+                )
+                # Hele BibTeX-entryen (etter felttillegg):
+                report_line(join_entry(entries_list[m]).rstrip())
+                report_line("")  # tom linje mellom entries i samme gruppe
+
+            report_line("% ---------------------------------")  # separator mellom grupper
 
     print(f"Rapport lagret som: {report_path}")
 
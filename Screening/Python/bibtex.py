@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+Felles BibTeX-hjelpere for scriptene i denne mappa (clean_ISSN.py, Unique.py, Screening.py).
+Importeres som f.eks. `from bibtex import iter_entries, read_text` (scriptene kjøres fra denne mappa).
+"""
+
+import mmap
+import os
+import re
+
+ENTRY_START_RE = re.compile(r'@(?P<type>[A-Za-z]+)\s*\{', re.M)
+
+def brace_end(text: str, i: int) -> int:
+    """text[i] == '{': posisjon rett etter matchende '}', eller -1 hvis ubalansert.
+    Hopper mellom str.find-treff i stedet for å gå tegn for tegn."""
+    depth = 1
+    j = i + 1
+    next_open = text.find("{", j)
+    while True:
+        close = text.find("}", j)
+        if close == -1:
+            return -1
+        # åpninger før denne '}' øker dybden
+        while next_open != -1 and next_open < close:
+            depth += 1
+            next_open = text.find("{", next_open + 1)
+        depth -= 1
+        j = close + 1
+        if depth == 0:
+            return j
+
+def iter_entries(text: str):
+    """
+    Yielder komplette entries (@type{ … }) fra rå BibTeX-tekst, ved balansering av klammer.
+    Tekst mellom entries hoppes over. En entry uten matchende '}' gis med resten av teksten.
+    """
+    i = 0
+    n = len(text)
+    while True:
+        m = ENTRY_START_RE.search(text, i)
+        if not m:
+            return
+        start = m.start()
+        end = brace_end(text, m.end() - 1)
+        if end == -1:
+            yield text[start:n]
+            return
+        yield text[start:end]
+        i = end
+
+def read_text(path, encoding: str = "utf-8", errors: str = "strict") -> str:
+    """
+    Leser hele filen som str via skrivebeskyttet mmap: bytes dekodes rett fra page cache,
+    uten en ekstra bytes-kopi i heap. Linjeskift normaliseres som ved open(..., "r").
+    """
+    with open(path, "rb") as f:
+        fd = f.fileno()
+        if os.fstat(fd).st_size == 0:
+            return ""
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as buf:
+            text = str(buf, encoding, errors)
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
@@ -1,8 +1,12 @@
 # -*- coding: utf-8 -*-
+import os
 import re
 import unicodedata
+from functools import lru_cache
 from pathlib import Path
 
+from bibtex import iter_entries, read_text
+
 # --- Prosjektrot = mappa som inneholder "Python", "1. bib files", osv. ---
 ROOT_DIR = Path(__file__).resolve().parent.parent
 
@@ -12,10 +16,22 @@ DEFAULT_OUTPUT_ROOT  = ROOT_DIR / "2.BibTex_clean_ISSN"   # rensede filer
 DEFAULT_REPORTS_DIR  = ROOT_DIR / "Reports"               # rapporter
 DEFAULT_REPORT_FILENAME = "check 1 clean ISSN.bib"        # samlet rapport
 
+# --- Regex-mønstre (kompileres én gang, ikke per entry) ---
+ISSN_NOISE_RE = re.compile(r'[^0-9xX]')
+TITLE_PUNCT_RE = re.compile(r"[^\w\s]", re.UNICODE)
+WS_RE = re.compile(r"\s+")
+
+# ISSN: alle ASCII-tegn unntatt sifre og x/X slettes med translate (vanlig tilfelle, uten regex)
+ISSN_KEEP = "0123456789xX"
+ISSN_DROP_ASCII = str.maketrans("", "", "".join(chr(c) for c in range(128) if chr(c) not in ISSN_KEEP))
+
 def normalize_issn(raw):
     if not raw:
         return None
-    s = re.sub(r'[^0-9xX]', '', raw).upper()
+    if raw.isascii():
+        s = raw.translate(ISSN_DROP_ASCII).upper()
+    else:
+        s = ISSN_NOISE_RE.sub('', raw).upper()
     if len(s) != 8:
         return None
     return s[:4] + "-" + s[4:]
@@ -35,47 +51,53 @@ def normalize_title(title):
     t = unicodedata.normalize("NFKD", t)
     t = "".join(ch for ch in t if not unicodedata.combining(ch))
     t = t.replace("{", "").replace("}", "")
-    t = re.sub(r"[^\w\s]", " ", t, flags=re.UNICODE)
+    t = TITLE_PUNCT_RE.sub(" ", t)
     t = t.lower()
-    t = re.sub(r"\s+", " ", t).strip()
+    t = WS_RE.sub(" ", t).strip()
     return t or None
 
-def extract_field(entry_text, field_name):
-    # Fanger felt = { … } eller " … " (tolerant, multiline)
-    pattern = re.compile(
+@lru_cache(maxsize=32)
+def _field_re(field_name):
+    # Ett kompilert mønster per feltnavn (gjenbrukes for alle entries)
+    return re.compile(
         r'(?im)^\s*' + re.escape(field_name) + r'\s*=\s*([{"].*?[}"])',
         re.DOTALL | re.IGNORECASE | re.MULTILINE
     )
-    m = pattern.search(entry_text)
+
+def extract_field(entry_text, field_name):
+    # Fanger felt = { … } eller " … " (tolerant, multiline)
+    m = _field_re(field_name).search(entry_text)
     return m.group(1) if m else None
 
-def split_entries(bib_text):
-    # Splitt ved å balansere {} fra hver @type{ … }
-    entries, i, n = [], 0, len(bib_text)
-    while i < n:
-        at = bib_text.find('@', i)
-        if at == -1:
-            break
-        br = bib_text.find('{', at)
-        if br == -1:
-            break
-        depth, j = 1, br + 1
-        while j < n and depth > 0:
-            c = bib_text[j]
-            if c == '{':
-                depth += 1
-            elif c == '}':
-                depth -= 1
-            j += 1
-        if depth == 0:
-            entries.append(bib_text[at:j])
-            i = j
-        else:
+# Feltene dedupliseringen bruker, lest i ett pass per entry (se extract_fields)
+DEDUPE_FIELDS = ("issn", "title")
+DEDUPE_FIELDS_RE = re.compile(
+    r'(?im)^\s*(?:' + "|".join(f"({re.escape(f)})" for f in DEDUPE_FIELDS) + r')\s*=\s*[{"]'
+)
+
+def extract_fields(entry_text):
+    """
+    Som extract_field for alle DEDUPE_FIELDS, men med ett regex-pass over entryen.
+    Verdien går (som før) fra { eller " til første } eller ", med avgrensere.
+    Returnerer {feltnavn: verdi}; felt som mangler er ikke med.
+    """
+    found = {}
+    for m in DEDUPE_FIELDS_RE.finditer(entry_text):
+        name = DEDUPE_FIELDS[m.lastindex - 1]
+        if name in found:
+            continue
+        start = m.end() - 1  # posisjon til { / "
+        close_b = entry_text.find("}", m.end())
+        close_q = entry_text.find('"', m.end())
+        close = min(close_b, close_q) if close_b != -1 and close_q != -1 else max(close_b, close_q)
+        if close == -1:
+            # ingen avslutning etter denne – heller ikke etter senere treff
+            found[name] = None
+            continue
+        found[name] = entry_text[start:close + 1]
+        if len(found) == len(DEDUPE_FIELDS):
             break
-    if not entries:
-        parts = re.split(r'(?=@\w+\s*\{)', bib_text)
-        entries = [p for p in parts if p.strip()]
-    return entries
+    return {k: v for k, v in found.items() if v is not None}
 
 def clean_bibtex_duplicates_with_report(
     input_path: str | Path | None = None,
@@ -101,7 +123,7 @@ def clean_bibtex_duplicates_with_report(
 
     # Finn inngangsfiler
     if p.is_dir():
-        files = sorted([f for f in p.glob("*.bib") if f.is_file()])
+        files = sorted(Path(e.path) for e in os.scandir(p) if e.name.endswith(".bib") and e.is_file())
     elif p.is_file() and p.suffix.lower() == ".bib":
         files = [p]
     else:
@@ -127,8 +149,8 @@ def clean_bibtex_duplicates_with_report(
     total_removed_all_files = 0
 
     for f in files:
-        text = f.read_text(encoding="utf-8", errors="ignore")
-        entries = split_entries(text)
+        text = read_text(f, encoding="utf-8", errors="ignore")
+        entries = list(iter_entries(text))
 
         seen = set()     # (issn_norm, title_norm)
         kept_entries = []
@@ -136,8 +158,9 @@ def clean_bibtex_duplicates_with_report(
         removed_count = 0
 
         for idx, e in enumerate(entries):
-            raw_issn = extract_field(e, "issn")
-            raw_title = extract_field(e, "title")
+            fields = extract_fields(e)
+            raw_issn = fields.get("issn")
+            raw_title = fields.get("title")
             norm_issn = normalize_issn(strip_braces_quotes(raw_issn) if raw_issn else None)
             norm_title = normalize_title(raw_title) if raw_title else None
 
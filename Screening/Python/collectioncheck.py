@@ -1,4 +1,6 @@
+import os
 import re
+from functools import lru_cache
 from pathlib import Path
 
 # --- KONFIG (relativt til prosjektrot) ---
@@ -12,20 +14,31 @@ DISCIPLINE_DIR = ROOT / "4.Remove collections"  # ny mappe for renset/disiplin-f
 
 HIGHLIGHT_PREFIX = "% === HIGHLIGHT: title gjentar journal-delen etter bindestrek ===\n"
 
+# Regex-mønstre kompileres én gang (ikke per entry/kall)
+ENTRY_SPLIT_RE = re.compile(r'(?m)^(?=@)')
+NON_ALNUM_RE = re.compile(r'[^a-z0-9]+')
+WS_RE = re.compile(r'\s+')
+COLLECTION_TAIL_RE = re.compile(r'collection[^-–—:]*[-–—:]\s*(.+)$', re.IGNORECASE)
+DASH_COLON_RE = re.compile(r'[-–—:]')
+
 def split_bib_entries(text: str):
     """Del opp BibTeX-tekst i entries ved linjer som starter med '@'."""
-    parts = re.split(r'(?m)^(?=@)', text)
+    parts = ENTRY_SPLIT_RE.split(text)
     return [p for p in parts if p.strip()]
 
+@lru_cache(maxsize=32)
+def _field_re(field_name: str):
+    """Kompilert mønster for ett feltnavn (gjenbrukes for alle entries)."""
+    return re.compile(
+        rf'(?mi)^\s*{re.escape(field_name)}\s*=\s*(\{{(?:[^{{}}]|\{{[^{{}}]*\}})*\}}|"[^"]*"|[^,\n]+)'
+    )
+
 def extract_field(entry_text: str, field_name: str):
     """
     Hent ut et felt (f.eks. journal/title) som kan stå i {...}, "..." eller som råtekst.
     Tåler moderat nivå av nestede klammer.
     """
-    pattern = re.compile(
-        rf'(?mi)^\s*{re.escape(field_name)}\s*=\s*(\{{(?:[^{{}}]|\{{[^{{}}]*\}})*\}}|"[^"]*"|[^,\n]+)'
-    )
-    m = pattern.search(entry_text)
+    m = _field_re(field_name).search(entry_text)
     if not m:
         return None
     raw = m.group(1).strip()
@@ -36,11 +49,12 @@ def extract_field(entry_text: str, field_name: str):
         raw = raw[1:-1]
     return raw.strip()
 
+@lru_cache(maxsize=50_000)
 def normalize_text(s: str) -> str:
     """Robust sammenlikning: lower, fjern ikke-alfanumerisk, kollaps mellomrom."""
     s = s.lower()
-    s = re.sub(r'[^a-z0-9]+', ' ', s)
-    return re.sub(r'\s+', ' ', s).strip()
+    s = NON_ALNUM_RE.sub(' ', s)
+    return WS_RE.sub(' ', s).strip()
 
 def extract_collection_tail(journal: str):
     """
@@ -52,22 +66,25 @@ def extract_collection_tail(journal: str):
     if not journal or "collection" not in journal.lower():
         return None
 
-    m = re.search(r'collection[^-–—:]*[-–—:]\s*(.+)$', journal, flags=re.IGNORECASE)
+    m = COLLECTION_TAIL_RE.search(journal)
     if m:
         return m.group(1).strip()
 
     # Fallback: bruk siste dash/kolon hvis finnes
-    parts = re.split(r'[-–—:]', journal)
+    parts = DASH_COLON_RE.split(journal)
     if len(parts) >= 2:
         tail = parts[-1].strip()
         return tail if tail else None
 
     return None
 
-def title_repeats_tail(title, tail) -> bool:
-    if not title or not tail:
+def title_repeats_tail(nt, tail) -> bool:
+    """nt: allerede normalisert tittel (normalize_text), tail: rå journal-hale."""
+    if not nt or not tail:
+        return False
+    # ASCII blir aldri lengre av normaliseringen, så korte haler kan avvises uten den
+    if len(tail) < 5 and tail.isascii():
         return False
-    nt = normalize_text(title)
     nh = normalize_text(tail)
     if len(nh) < 5:  # unngå kortord/falske treff
         return False
@@ -93,7 +110,8 @@ def process_file(bib_path: Path, collections_dir: Path, discipline_dir: Path):
         if is_collection:
             total_collection_entries += 1
             tail = extract_collection_tail(journal)
-            is_highlight = title_repeats_tail(title, tail)
+            nt = normalize_text(title) if title else None
+            is_highlight = title_repeats_tail(nt, tail)
 
             # Skriv til collections-filen (alltid hvis collection)
             if is_highlight:
@@ -131,7 +149,8 @@ def main():
     total_collection_entries = 0
     total_highlighted = 0
 
-    for bib_path in IN_DIR.glob("*.bib"):
+    bib_paths = sorted(Path(e.path) for e in os.scandir(IN_DIR) if e.name.endswith(".bib") and e.is_file())
+    for bib_path in bib_paths:
         total_files += 1
         stats = process_file(bib_path, COLLECTIONS_DIR, DISCIPLINE_DIR)
         print(